@@ -1,36 +1,66 @@
 import logging
-from copy import deepcopy
-from math import log, sqrt
-from random import choice
-from time import perf_counter
+import random
+from functools import partial
+from random import choice, randrange
+from time import perf_counter, sleep
+from weakref import WeakKeyDictionary
 
+import numpy as np
 from hex.agent import HexAgent
-from hex.board import P1, P2, Hex, HexBase, possible_moves
+from hex.board import P1, P2, Hex, HexBase, HexBitBoard, shortest_path_cells, zobrist_keys
+
+from agents.profiling import SearchStats
+from agents.rollout import batch_rollout
+from agents.transposition import TranspositionTable
 
 EXPLORE = 0.5
 RAVE_CONST = 300
 ROLLOUT = 5000
+# Seconds per move, overrides ROLLOUT when set.
+TIME_BUDGET = None
+# Tree arrays grow by at least this many nodes at a time.
+TREE_CHUNK = 1 << 14
+# Pondering stops once the tree holds this many nodes (about 56 bytes each,
+# plus up to half again of spare capacity), and sleeps PONDER_PAUSE seconds
+# every PONDER_PAUSE_EVERY iterations to let the GUI thread run.
+PONDER_MAX_NODES = 1 << 18
+PONDER_PAUSE_EVERY = 64
+PONDER_PAUSE = 0.001
+# Record per-phase SearchStats in the agents of best_move, and append them
+# as JSON lines to PROFILE_PATH after every move when it is set.
+PROFILE = False
+PROFILE_PATH = None
+# Virtual RAVE wins the MCTS-distance agent gives to the children of a new
+# node that lie on a shortest connection of either player.
+DISTANCE_PRIOR = 20
+ROOT = 0
+# Source of the seeds of the numpy generators of new agents, see seed().
+seed_sequence = np.random.SeedSequence()
 """
-NODE:
+TREE (struct of arrays, one entry per node):
     VALUE STORAGE:
         1) Number of times visited (N)
         2) Total reward obtained (Q)
-        3) Parent (default = None)
-        4) children - empty list
+        3) Parent (-1 for the root)
+        4) first_child, num_children - children are stored contiguously
         5) N rave
         6) Q rave
-        7) move required to move parent to current node
+        7) move required to move parent to current node, as flat index i*size + j
+        8) Zobrist hash of the node's position
     FUNCTIONS:
-        1) Value of node using formula
+        1) Values of a node's children using formula, vectorized
         2) add_children
 """
 
 """
 MCTS Agent:
     VALUE STORAGE:
-        1) Root node
+        1) Tree, root node is ROOT
         2) root_state
         3) run time limit
+        4) optional transposition table shared by nodes of the same position
+        5) optional SearchStats recording the cost of every phase
+        6) prior, virtual RAVE wins of moves on a shortest connection
     FUNCTIONS:
         1) search
         2) select_node
@@ -40,39 +70,109 @@ MCTS Agent:
 """
 
 
-class Node:
-    def __init__(self, move: tuple = None, parent=None):
-        self.parent = parent
-        self.move = move
-        self.children = []
-
-        self.N = 0
-        self.Q = 0
-        self.N_rave = 0
-        self.Q_rave = 0
+class Tree:
+    FIELDS = (('N', np.int64), ('Q', np.float64), ('N_rave', np.int64), ('Q_rave', np.float64),
+              ('move', np.int32), ('parent', np.int32), ('first_child', np.int32),
+              ('num_children', np.int32), ('hash', np.uint64))
 
-    def get_value(self):
-        return self.N
+    def __init__(self, capacity=TREE_CHUNK, root_hash=0):
+        for name, dtype in Tree.FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self.parent[ROOT] = -1
+        self.move[ROOT] = -1
+        self.hash[ROOT] = root_hash
+        self.num_nodes = 1
 
     @property
-    def value(self, explore=EXPLORE):
-        if self.N == 0:
-            return 0 if explore == 0 else float('inf')
-        else:
-            rave_weight = max(0, 1 - (self.N_rave/RAVE_CONST))
-            UCT_value = self.Q/self.N + explore * \
-                sqrt(2 * log(self.parent.N/self.N))
-            rave_value = self.Q_rave/self.N_rave if self.N_rave != 0 else 0
-
-            value = (1 - rave_weight)*UCT_value + rave_weight*rave_value
-            return value
+    def capacity(self):
+        return len(self.N)
 
-    def add_children(self, new_children: dict):
-        self.children.extend(new_children)
+    @property
+    def node_bytes(self):
+        return sum(getattr(self, name).itemsize for name, _ in Tree.FIELDS)
 
     @property
-    def isleaf(self):
-        return True if len(self.children) == 0 else False
+    def nbytes(self):
+        return self.capacity * self.node_bytes
+
+    def reserve(self, num_nodes):
+        """
+        Grows the arrays in chunks so that they hold at least num_nodes nodes.
+        """
+        capacity = self.capacity
+        if num_nodes <= capacity:
+            return
+        new_capacity = max(num_nodes, capacity + TREE_CHUNK, capacity + capacity // 2)
+        for name, _ in Tree.FIELDS:
+            old = getattr(self, name)
+            new = np.zeros(new_capacity, dtype=old.dtype)
+            new[:capacity] = old
+            setattr(self, name, new)
+
+    def children(self, node):
+        first = self.first_child[node]
+        return slice(first, first + self.num_children[node])
+
+    def isleaf(self, node):
+        return self.num_children[node] == 0
+
+    def add_children(self, node, moves, hashes):
+        count = len(moves)
+        first = self.num_nodes
+        self.reserve(first + count)
+        children = slice(first, first + count)
+        self.move[children] = moves
+        self.hash[children] = hashes
+        self.parent[children] = node
+        self.first_child[node] = first
+        self.num_children[node] = count
+        self.num_nodes += count
+
+    def values(self, node, explore=EXPLORE, shared=None):
+        """
+        UCT+RAVE value of every child of node. shared optionally gives the
+        (N, Q, parent N) to use instead of the tree's own, e.g. the statistics
+        of the children positions in a transposition table.
+        """
+        children = self.children(node)
+        if shared is None:
+            N, Q, parent_N = self.N[children], self.Q[children], self.N[node]
+        else:
+            N, Q, parent_N = shared
+        N_rave = self.N_rave[children]
+        visited = N > 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rave_weight = np.maximum(0, 1 - N_rave/RAVE_CONST)
+            UCT_value = Q/N + explore * np.sqrt(2 * np.log(np.maximum(parent_N/N, 1)))
+            rave_value = np.where(N_rave != 0, self.Q_rave[children]/N_rave, 0)
+            value = (1 - rave_weight)*UCT_value + rave_weight*rave_value
+        value[~visited] = 0 if explore == 0 else np.inf
+        return value
+
+    def subtree(self, node):
+        """
+        Returns a new tree holding the subtree of node, with node as its root.
+        """
+        order = [np.array([node])]
+        frontier = order[0]
+        while len(frontier):
+            frontier = frontier[self.num_children[frontier] > 0]
+            counts = self.num_children[frontier]
+            offsets = np.repeat(self.first_child[frontier] - (np.cumsum(counts) - counts), counts)
+            frontier = offsets + np.arange(counts.sum())
+            order.append(frontier)
+        order = np.concatenate(order)
+
+        new_index = np.full(self.num_nodes, -1, dtype=np.int32)
+        new_index[order] = np.arange(len(order))
+        new = Tree(max(len(order), TREE_CHUNK))
+        for name, _ in Tree.FIELDS:
+            getattr(new, name)[:len(order)] = getattr(self, name)[order]
+        new.parent[:len(order)] = np.where(order == node, -1, new_index[self.parent[order]])
+        new.first_child[:len(order)] = np.where(new.num_children[:len(order)] > 0,
+                                                new_index[self.first_child[order]], 0)
+        new.num_nodes = len(order)
+        return new
 
 
 """
@@ -85,123 +185,376 @@ Each iteration:
 
 
 class MCTSAgent:
-    def __init__(self, root_state: HexBase) -> None:
-        self.root_node = Node()
-        self.root_state = deepcopy(root_state)
+    def __init__(self, root_state: HexBase, transpositions: TranspositionTable = None,
+                 stats: SearchStats = None, prior=0, moves=()) -> None:
+        self.tree = Tree(root_hash=root_state.hash)
+        # Moves of the game up to the root state, those given and those played by move().
+        self.moves = list(moves)
+        self.transpositions = transpositions
+        self.stats = stats
+        self.prior = prior
+        self.root_state = root_state.copy(undoable=True)
+        self.size = root_state.size
         self.num_rollouts = 0
+        self.rng = np.random.default_rng(seed_sequence.spawn(1)[0])
+
+    def cell(self, node):
+        return divmod(int(self.tree.move[node]), self.size)
 
     def simulate(self, state: HexBase):
-        curr_state = deepcopy(state)
-        legal_moves = possible_moves(curr_state.size, curr_state.board)
+        '''
+        Plays a random game from state. Returns the winner and the owner of
+        every cell played during the playout as a flat int8 array
+        (EMPTY for cells that were not played).
+        '''
+        curr_state = state.copy()
+        played = []
 
         while curr_state.winner is None:
-            curr_action = choice(legal_moves)
+            curr_action = curr_state.random_move()
             curr_state.step(curr_action)
-            legal_moves.remove(curr_action)
+            played.append(curr_action[0]*self.size + curr_action[1])
 
-        black_rave_pts = []
-        white_rave_pts = []
+        owner = np.zeros(self.size*self.size, dtype=np.int8)
+        owner[played[0::2]] = state.turn
+        owner[played[1::2]] = -state.turn
 
-        for x in range(state.size):
-            for y in range(state.size):
-                if state.board[(x, y)] == P1:
-                    black_rave_pts.append((x, y))
-                elif state.board[(x, y)] == P2:
-                    white_rave_pts.append((x, y))
+        return curr_state.winner, owner
 
-        return curr_state.winner, black_rave_pts, white_rave_pts
-
-    def expand(self, node: Node, state):
+    def expand(self, node, state):
         if state.winner is not None:
             return False
 
-        node.add_children([Node(move, node)
-                          for move in possible_moves(state.size, state.board)])
+        start = perf_counter() if self.stats is not None else None
+        moves = np.array(state.legal_indices(), dtype=np.int64)
+        keys = zobrist_keys(self.size)[0 if state.turn == P1 else 1]
+        self.tree.add_children(node, moves, self.tree.hash[node] ^ keys[moves])
+        if self.transpositions is not None:
+            self.add_transpositions(node)
+        if self.prior:
+            self.add_prior(node, state)
+        if start is not None:
+            self.stats.expansions += 1
+            self.stats.expand_time += perf_counter() - start
         return True
 
+    def add_transpositions(self, node):
+        '''
+        Starts N, Q of the children of node from the transposition table
+        entries of their positions, searched before through other move orders.
+        '''
+        tree = self.tree
+        children = tree.children(node)
+        for child, key in enumerate(tree.hash[children].tolist(), children.start):
+            entry = self.transpositions.get(key)
+            if entry is not None:
+                tree.N[child], tree.Q[child] = entry
+
+    def add_prior(self, node, state):
+        '''
+        Starts the RAVE statistics of the children of node on a shortest
+        connection of either player with prior wins, so that selection
+        tries the cells that make or block a connection first.
+        '''
+        board = state.board
+        on_path = shortest_path_cells(board, self.size, P1) | shortest_path_cells(board, self.size, P2)
+        children = self.tree.children(node)
+        hits = on_path[self.tree.move[children]]
+        self.tree.N_rave[children] += self.prior * hits
+        self.tree.Q_rave[children] += self.prior * hits
+
+    def shared_stats(self, node):
+        '''
+        N, Q of the children of node and N of node, replaced by the
+        transposition table entries of their positions where those have
+        more visits.
+        '''
+        tree = self.tree
+        children = tree.children(node)
+        N = tree.N[children].copy()
+        Q = tree.Q[children].copy()
+        for i, key in enumerate(tree.hash[children].tolist()):
+            entry = self.transpositions.get(key, N[i])
+            if entry is not None:
+                N[i], Q[i] = entry
+        parent_N = tree.N[node]
+        entry = self.transpositions.get(int(tree.hash[node]), parent_N)
+        if entry is not None:
+            parent_N = entry[0]
+        return N, Q, parent_N
+
+    def rewind(self):
+        '''
+        Undoes the moves select_node played on the root state.
+        '''
+        while self.root_state.history:
+            self.root_state.undo()
+
     def select_node(self):
-        node = self.root_node
-        state = deepcopy(self.root_state)
-
-        while not node.isleaf:
-            benchmark = float('-inf')
-            max_children = []
-            for child_node in node.children:
-                curr_value = child_node.value
-                if curr_value > benchmark:
-                    benchmark = curr_value
-                    max_children = []
-                    max_children.append(child_node)
-                elif curr_value == benchmark:
-                    max_children.append(child_node)
-
-            node = choice(max_children)
-            state.step(node.move)
-
-            if node.N == 0:
+        '''
+        Plays the selected path on the root state itself, which stays
+        there until the next select_node or rewind.
+        '''
+        self.rewind()
+        tree = self.tree
+        node = ROOT
+        state = self.root_state
+
+        while not tree.isleaf(node):
+            if self.transpositions is None:
+                values = tree.values(node)
+            else:
+                values = tree.values(node, shared=self.shared_stats(node))
+            max_children = np.flatnonzero(values == values.max())
+            node = tree.first_child[node] + max_children[randrange(len(max_children))]
+            state.step(self.cell(node))
+
+            if tree.N[node] == 0:
                 return node, state
 
         if self.expand(node, state):
-            node = choice(node.children)
-            state.step(node.move)
+            node = tree.first_child[node] + randrange(tree.num_children[node])
+            state.step(self.cell(node))
         return node, state
 
-    def backpropagate(self, node, outcome, turn, black_rave_pts, white_rave_pts):
+    def backpropagate(self, node, outcome, turn, owner):
+        '''
+        Updates N/Q from node up to the root. The RAVE statistics of a node's
+        children are updated for the cells that the player to move at the
+        node played after it: owner starts as the playout stones and the move
+        of each node is added to it on the way up.
+        '''
+        tree = self.tree
         reward = -1 if outcome == turn else 1
 
-        while node is not None:
-            for i, child_node in enumerate(node.children):
-                if turn == P2:
-                    if child_node.move in white_rave_pts:
-                        node.children[i].Q_rave += -reward
-                        node.children[i].N_rave += 1
-                else:
-                    if child_node.move in black_rave_pts:
-                        node.children[i].Q_rave += -reward
-                        node.children[i].N_rave += 1
+        while node != -1:
+            if tree.num_children[node]:
+                children = tree.children(node)
+                hits = owner[tree.move[children]] == turn
+                tree.Q_rave[children] -= reward * hits
+                tree.N_rave[children] += hits
+
+            tree.N[node] += 1
+            tree.Q[node] += reward
+            if self.transpositions is not None:
+                self.transpositions.update(int(tree.hash[node]), 1, reward)
 
-            node.N += 1
-            node.Q += reward
+            parent = tree.parent[node]
+            if parent != -1:
+                owner[tree.move[node]] = -turn
 
             turn = -turn
             reward = -reward
 
-            node = node.parent
+            node = parent
+
+    def backpropagate_batch(self, node, turn, result):
+        '''
+        Backpropagates the aggregated outcome of a batch rollout.
+        '''
+        tree = self.tree
+        visits = result.wins[P1] + result.wins[P2]
+        reward = result.wins[-turn] - result.wins[turn]
+        amaf_visits = {player: result.amaf_visits[player].ravel().copy() for player in (P1, P2)}
+        amaf_wins = {player: result.amaf_wins[player].ravel().copy() for player in (P1, P2)}
+
+        while node != -1:
+            children = tree.children(node)
+            moves = tree.move[children]
+            child_visits = amaf_visits[turn][moves]
+            tree.N_rave[children] += child_visits
+            tree.Q_rave[children] += 2*amaf_wins[turn][moves] - child_visits
+
+            tree.N[node] += visits
+            tree.Q[node] += reward
+            if self.transpositions is not None:
+                self.transpositions.update(int(tree.hash[node]), visits, reward)
+
+            # The move into node was played after its parent in all rollouts.
+            parent = tree.parent[node]
+            if parent != -1:
+                amaf_visits[-turn][tree.move[node]] += visits
+                amaf_wins[-turn][tree.move[node]] += result.wins[-turn]
 
-    def search(self, num_rollout=ROLLOUT):
-        rollout_limit = num_rollout
+            turn = -turn
+            reward = -reward
+
+            node = parent
+
+    def search(self, num_rollout=ROLLOUT, batch_size=None, time_budget=None, stop_event=None,
+               max_nodes=None, pause_every=None):
+        '''
+        Runs num_rollout rollouts. If batch_size is given each selected leaf
+        is evaluated with batch_size rollouts at once by agents.rollout.
+        If time_budget (seconds) is given the search runs until that deadline
+        instead, and setting stop_event ends it early. The search also stops
+        once the tree holds max_nodes nodes, and sleeps PONDER_PAUSE seconds
+        every pause_every iterations if those are given. The best move so far
+        is available from best_move once at least one rollout is done.
+        '''
+        rollout_limit = float('inf') if time_budget is not None else num_rollout
+        deadline = None if time_budget is None else perf_counter() + time_budget
         num_rollouts = 0
+        iterations = 0
         while num_rollouts < rollout_limit:
-            node, state = self.select_node()
-            turn = state.turn
-            outcome, black, white = self.simulate(state)
-            self.backpropagate(node, outcome, turn, black, white)
-            num_rollouts += 1
+            if num_rollouts > 0:
+                if deadline is not None and perf_counter() >= deadline:
+                    break
+                if stop_event is not None and stop_event.is_set():
+                    break
+                if max_nodes is not None and self.tree.num_nodes >= max_nodes:
+                    break
+            num_rollouts += self.iteration(batch_size)
+            iterations += 1
+            if pause_every is not None and iterations % pause_every == 0:
+                sleep(PONDER_PAUSE)
+        self.rewind()
         self.num_rollouts = num_rollouts
 
+    def iteration(self, batch_size=None):
+        '''
+        One select, rollout and backpropagate step of search, with batch_size
+        rollouts of the selected leaf if it is given. Records the time and
+        size of every phase in self.stats when it is set. Returns the number
+        of rollouts done.
+        '''
+        stats = self.stats
+        profile = stats is not None
+        if profile:
+            num_nodes = self.tree.num_nodes
+            expand_time = stats.expand_time
+            start = perf_counter()
+
+        node, state = self.select_node()
+        selected = perf_counter() if profile else None
+
+        turn = state.turn
+        if batch_size is None:
+            outcome, owner = self.simulate(state)
+            rollouts = 1
+            rollout_moves = int(np.count_nonzero(owner)) if profile else 0
+            simulated = perf_counter() if profile else None
+            self.backpropagate(node, outcome, turn, owner)
+        else:
+            result = batch_rollout(state.board, turn, batch_size, self.rng)
+            rollouts = batch_size
+            rollout_moves = len(state.empty)
+            simulated = perf_counter() if profile else None
+            self.backpropagate_batch(node, turn, result)
+
+        if profile:
+            stats.select_time += selected - start - (stats.expand_time - expand_time)
+            stats.rollout_time += simulated - selected
+            stats.backprop_time += perf_counter() - simulated
+            stats.add_depth(len(state.history))
+            stats.add_rollout(rollout_moves, rollouts)
+            stats.nodes_allocated += self.tree.num_nodes - num_nodes
+            stats.add_tree(self.tree)
+        return rollouts
+
     def best_move(self) -> tuple:
-        benchmark = float('-inf')
-        max_children = []
-        for child_node in self.root_node.children:
-            curr_value = child_node.get_value()
-            if curr_value > benchmark:
-                benchmark = curr_value
-                max_children = []
-                max_children.append(child_node)
-            elif curr_value == benchmark:
-                max_children.append(child_node)
-
-        return choice(max_children).move
-
-
-def best_move(board: Hex):
-    board = board.get_base()
-    agent = MCTSAgent(board)
+        visits = self.tree.N[self.tree.children(ROOT)]
+        max_children = np.flatnonzero(visits == visits.max())
+        return self.cell(self.tree.first_child[ROOT] + choice(max_children))
+
+    def move(self, move):
+        '''
+        Plays move on the root state and makes the matching child the new root,
+        keeping the statistics of its subtree and dropping the rest of the tree.
+        Falls back to a fresh root if the move was never expanded.
+        '''
+        children = self.tree.children(ROOT)
+        matches = np.flatnonzero(self.tree.move[children] == move[0]*self.size + move[1])
+        self.rewind()
+        self.root_state.step(move)
+        self.root_state.commit()
+        self.moves.append(move)
+        if len(matches):
+            self.tree = self.tree.subtree(children.start + matches[0])
+        else:
+            self.tree = Tree(root_hash=self.root_state.hash)
+
+
+# Search trees kept for each game in progress, so that statistics gathered
+# under the moves actually played carry over to the next search. Every game
+# maps (seat, bitboard, prior, transpositions) to its own agent, so two agents
+# playing each other never share or rebuild each other's tree.
+game_agents = WeakKeyDictionary()
+
+
+def get_agent(game: Hex, bitboard=False, prior=0, seat=None, transpositions=False) -> MCTSAgent:
+    '''
+    Returns the persistent agent of the player at seat, by default the player
+    to move, advanced through the moves played since its last search. A new
+    agent replaces it if the game no longer starts with the moves it has
+    seen, e.g. after Hex.undo. With transpositions the agent owns a
+    TranspositionTable kept across its moves.
+    '''
+    key = (game.turn if seat is None else seat, bitboard, prior, transpositions)
+    agents = game_agents.setdefault(game, {})
+    agent = agents.get(key)
+    history = game.move_history
+    if agent is None or history[:len(agent.moves)] != agent.moves:
+        board = game.get_base()
+        agent = MCTSAgent(HexBitBoard.from_base(board) if bitboard else board,
+                          TranspositionTable() if transpositions else None,
+                          stats=SearchStats() if PROFILE else None, prior=prior, moves=history)
+    else:
+        for move in history[len(agent.moves):]:
+            agent.move(move)
+    agents[key] = agent
+    return agent
+
+
+def seed(value):
+    '''
+    Seeds the random module, which selection and playouts use, and the
+    generators of the agents created from now on.
+    '''
+    global seed_sequence
+    random.seed(value)
+    seed_sequence = np.random.SeedSequence(value)
+
+
+def best_move(board: Hex, bitboard=False, prior=0, transpositions=False):
+    agent = get_agent(board, bitboard, prior, transpositions=transpositions)
+    reused = agent.tree.N[ROOT]
     start = perf_counter()
-    agent.search()
+    agent.search(time_budget=TIME_BUDGET)
     best_move = agent.best_move()
-    logging.info(f'Completed {agent.num_rollouts} rollouts in {(perf_counter()-start):.3f}s.')
+    logging.info(f'Completed {agent.num_rollouts} rollouts in {(perf_counter()-start):.3f}s '
+                 f'({reused} reused).')
+    if agent.stats is not None:
+        shares = agent.stats.as_dict()['phase_share']
+        logging.info('Phases: ' + ', '.join(f'{phase} {share:.0%}' for phase, share in shares.items()))
+        if PROFILE_PATH is not None:
+            agent.stats.dump(PROFILE_PATH, move_number=len(board.move_history), size=board.size,
+                             move=best_move, reused=int(reused))
+        agent.stats.reset()
+    if agent.transpositions is not None:
+        logging.info(f'Transpositions: {agent.transpositions.stats()}')
     return best_move
 
 
-HexAgent('MCTS', best_move)
+def ponder(board: Hex, stop_event, bitboard=False, prior=0, transpositions=False):
+    '''
+    Searches the current position of the game, on the opponent's time,
+    until stop_event is set or the tree reaches PONDER_MAX_NODES nodes.
+    The tree is kept for the next best_move.
+    '''
+    agent = get_agent(board, bitboard, prior, seat=-board.turn, transpositions=transpositions)
+    agent.search(float('inf'), stop_event=stop_event, max_nodes=PONDER_MAX_NODES,
+                 pause_every=PONDER_PAUSE_EVERY)
+    logging.info(f'Pondered {agent.num_rollouts} rollouts, {agent.tree.num_nodes} nodes.')
+
+
+HexAgent('MCTS', best_move, ponder_func=ponder, seed_func=seed)
+HexAgent('MCTS-bitboard', partial(best_move, bitboard=True),
+         description='MCTS searching on a HexBitBoard',
+         ponder_func=partial(ponder, bitboard=True), seed_func=seed)
+HexAgent('MCTS-distance', partial(best_move, prior=DISTANCE_PRIOR),
+         description='MCTS preferring moves on a shortest connection of either player',
+         ponder_func=partial(ponder, prior=DISTANCE_PRIOR), seed_func=seed)
+HexAgent('MCTS-tt', partial(best_move, transpositions=True),
+         description='MCTS sharing statistics between transposed positions',
+         ponder_func=partial(ponder, transpositions=True), seed_func=seed)
@@ -0,0 +1,402 @@
+"""
+MCTS with RAVE compiled with numba.
+
+The tree is kept in flat arrays (one entry per node, children of a node are
+stored contiguously) and the board as a flat int8 array indexed by
+i*size + j, so the whole search loop runs inside @njit kernels. Kernels are
+compiled with cache=True, setup() loads or compiles them ahead of the
+first move. They release the GIL, so TreeParallelMCTSAgent can run
+playouts of several threads at once on one shared tree.
+"""
+import logging
+from functools import partial
+from random import choice, randrange
+from threading import Lock, Thread
+from time import perf_counter
+
+import numpy as np
+from hex.agent import HexAgent
+from hex.board import EMPTY, NO_NEIGHBOUR, P1, P2, Hex, HexBase
+from numba import njit
+
+from agents.mcts import EXPLORE, RAVE_CONST, ROLLOUT
+
+# Nodes are allocated in chunks of at least this size.
+GROW_CHUNK = 1 << 16
+THREADS = 4
+VIRTUAL_LOSS = 1
+
+
+@njit(cache=True, nogil=True)
+def uf_find(parent, x):
+    while parent[x] != x:
+        parent[x] = parent[parent[x]]
+        x = parent[x]
+    return x
+
+
+@njit(cache=True, nogil=True)
+def uf_join(parent, rank, x, y):
+    root_x = uf_find(parent, x)
+    root_y = uf_find(parent, y)
+    if root_x == root_y:
+        return False
+    if rank[root_x] < rank[root_y]:
+        parent[root_x] = root_y
+    elif rank[root_x] > rank[root_y]:
+        parent[root_y] = root_x
+    else:
+        parent[root_x] = root_y
+        rank[root_y] += 1
+    return True
+
+
+@njit(cache=True, nogil=True)
+def place(board, parent, rank, index, player, size, neighbours):
+    """
+    Places a stone and joins it to its edge and neighbouring groups.
+    parent and rank are (2, size*size + 2) arrays, row 0 for P1 and row 1 for P2.
+    """
+    board[index] = player
+    p = 0 if player == P1 else 1
+    coord = index // size if player == P1 else index % size
+    if coord == 0:
+        uf_join(parent[p], rank[p], size*size, index)
+    elif coord == size - 1:
+        uf_join(parent[p], rank[p], size*size + 1, index)
+    for k in range(6):
+        neighbour = neighbours[index, k]
+        if neighbour == NO_NEIGHBOUR:
+            break
+        if board[neighbour] == player:
+            uf_join(parent[p], rank[p], neighbour, index)
+
+
+@njit(cache=True, nogil=True)
+def build_groups(board, parent, rank, size, neighbours):
+    """
+    Resets the union-find arrays and joins every stone on the board.
+    """
+    for p in range(2):
+        for x in range(size*size + 2):
+            parent[p, x] = x
+            rank[p, x] = 0
+    for index in range(size*size):
+        if board[index] != EMPTY:
+            place(board, parent, rank, index, board[index], size, neighbours)
+
+
+@njit(cache=True, nogil=True)
+def get_winner(parent, size):
+    start = size*size
+    if uf_find(parent[1], start) == uf_find(parent[1], start + 1):
+        return P2
+    if uf_find(parent[0], start) == uf_find(parent[0], start + 1):
+        return P1
+    return EMPTY
+
+
+@njit(cache=True, nogil=True)
+def playout(board, parent, rank, turn, size, neighbours):
+    """
+    Plays random moves on board (modified in place) until a player connects.
+    Returns the winner.
+    """
+    empties = np.flatnonzero(board == EMPTY)
+    np.random.shuffle(empties)
+    for index in empties:
+        place(board, parent, rank, index, turn, size, neighbours)
+        p = 0 if turn == P1 else 1
+        if uf_find(parent[p], size*size) == uf_find(parent[p], size*size + 1):
+            return turn
+        turn = -turn
+    return get_winner(parent, size)
+
+
+@njit(cache=True, nogil=True)
+def select_child(node, N, Q, N_rave, Q_rave, first_child, num_children, explore, rave_const):
+    """
+    Returns the child of node with the highest UCT+RAVE value, ties broken at random.
+    """
+    best = -1
+    best_value = -np.inf
+    ties = 0
+    for child in range(first_child[node], first_child[node] + num_children[node]):
+        if N[child] == 0:
+            value = np.inf
+        else:
+            rave_weight = max(0.0, 1 - N_rave[child]/rave_const)
+            uct_value = Q[child]/N[child] + explore*np.sqrt(2*np.log(N[node]/N[child]))
+            rave_value = Q_rave[child]/N_rave[child] if N_rave[child] != 0 else 0.0
+            value = (1 - rave_weight)*uct_value + rave_weight*rave_value
+        if value > best_value:
+            best, best_value, ties = child, value, 1
+        elif value == best_value:
+            ties += 1
+            if np.random.randint(ties) == 0:
+                best = child
+    return best
+
+
+@njit(cache=True, nogil=True)
+def backpropagate(node, winner, turn, board, N, Q, N_rave, Q_rave, move, parent_node,
+                  first_child, num_children):
+    """
+    Updates N/Q up the tree from node, and the RAVE statistics of every child
+    whose move the player to move at its parent holds on the final board.
+    """
+    reward = -1 if winner == turn else 1
+    while node != -1:
+        for child in range(first_child[node], first_child[node] + num_children[node]):
+            if board[move[child]] == turn:
+                Q_rave[child] += -reward
+                N_rave[child] += 1
+        N[node] += 1
+        Q[node] += reward
+        turn = -turn
+        reward = -reward
+        node = parent_node[node]
+
+
+@njit(cache=True, nogil=True)
+def select_leaf(N, Q, N_rave, Q_rave, move, parent_node, first_child, num_children, num_nodes,
+                root_board, root_turn, size, neighbours, board, parent, rank,
+                explore, rave_const, virtual_loss):
+    """
+    Descends from the root to a leaf, expanding it if it was visited before,
+    and leaves the reached position in board/parent/rank. Every node on the
+    path gets virtual_loss lost visits, to be reverted by revert_virtual_loss.
+    Returns the node, the player to move there, the winner if the position
+    is terminal (EMPTY otherwise) and the new number of nodes.
+    """
+    board[:] = root_board
+    node = 0
+    turn = root_turn
+    reached_leaf = True
+    N[node] += virtual_loss
+    Q[node] -= virtual_loss
+    while num_children[node] > 0:
+        node = select_child(node, N, Q, N_rave, Q_rave, first_child, num_children,
+                            explore, rave_const)
+        board[move[node]] = turn
+        turn = -turn
+        unvisited = N[node] == 0
+        N[node] += virtual_loss
+        Q[node] -= virtual_loss
+        if unvisited:
+            reached_leaf = False
+            break
+
+    build_groups(board, parent, rank, size, neighbours)
+    winner = get_winner(parent, size)
+    if reached_leaf and winner == EMPTY:
+        empties = np.flatnonzero(board == EMPTY)
+        first_child[node] = num_nodes
+        num_children[node] = len(empties)
+        for k in range(len(empties)):
+            child = num_nodes + k
+            move[child] = empties[k]
+            parent_node[child] = node
+            num_children[child] = 0
+            N[child] = Q[child] = N_rave[child] = Q_rave[child] = 0
+        num_nodes += len(empties)
+
+        node = first_child[node] + np.random.randint(num_children[node])
+        N[node] += virtual_loss
+        Q[node] -= virtual_loss
+        place(board, parent, rank, move[node], turn, size, neighbours)
+        turn = -turn
+        winner = get_winner(parent, size)
+    return node, turn, winner, num_nodes
+
+
+@njit(cache=True, nogil=True)
+def revert_virtual_loss(node, virtual_loss, N, Q, parent_node):
+    while node != -1:
+        N[node] -= virtual_loss
+        Q[node] += virtual_loss
+        node = parent_node[node]
+
+
+@njit(cache=True, nogil=True)
+def run_search(N, Q, N_rave, Q_rave, move, parent_node, first_child, num_children, num_nodes,
+               root_board, root_turn, size, neighbours, iterations, explore, rave_const):
+    """
+    Runs iterations of selection, expansion, playout and backpropagation.
+    The node arrays must have room for iterations*size*size new nodes.
+    Returns the new number of nodes.
+    """
+    board = np.empty_like(root_board)
+    parent = np.empty((2, size*size + 2), dtype=np.int64)
+    rank = np.empty((2, size*size + 2), dtype=np.int64)
+    for _ in range(iterations):
+        node, turn, winner, num_nodes = select_leaf(
+            N, Q, N_rave, Q_rave, move, parent_node, first_child, num_children, num_nodes,
+            root_board, root_turn, size, neighbours, board, parent, rank,
+            explore, rave_const, 0)
+        if winner == EMPTY:
+            winner = playout(board, parent, rank, turn, size, neighbours)
+        backpropagate(node, winner, turn, board, N, Q, N_rave, Q_rave, move, parent_node,
+                      first_child, num_children)
+    return num_nodes
+
+
+@njit(cache=True, nogil=True)
+def seed(value):
+    np.random.seed(value)
+
+
+class NumbaMCTSAgent:
+    '''
+    MCTS agent with the same search/best_move interface as agents.mcts.MCTSAgent,
+    running on the numba kernels of this module.
+    '''
+
+    def __init__(self, root_state: HexBase, capacity=GROW_CHUNK) -> None:
+        self.size = root_state.size
+        self.root_board = root_state.board.ravel().astype(np.int8)
+        self.root_turn = root_state.turn
+        self.neighbours = root_state.topology.neighbours
+        self.num_rollouts = 0
+
+        self.N = np.zeros(capacity, dtype=np.int64)
+        self.Q = np.zeros(capacity, dtype=np.float64)
+        self.N_rave = np.zeros(capacity, dtype=np.int64)
+        self.Q_rave = np.zeros(capacity, dtype=np.float64)
+        self.move = np.full(capacity, -1, dtype=np.int64)
+        self.parent = np.full(capacity, -1, dtype=np.int64)
+        self.first_child = np.zeros(capacity, dtype=np.int64)
+        self.num_children = np.zeros(capacity, dtype=np.int64)
+        self.num_nodes = 1
+
+    def reserve(self, num_nodes):
+        '''
+        Grows the node arrays so that they hold at least num_nodes nodes.
+        '''
+        capacity = len(self.N)
+        if num_nodes <= capacity:
+            return
+        new_capacity = max(num_nodes, capacity + GROW_CHUNK, 2*capacity)
+        for name in ('N', 'Q', 'N_rave', 'Q_rave', 'move', 'parent', 'first_child', 'num_children'):
+            old = getattr(self, name)
+            new = np.zeros(new_capacity, dtype=old.dtype)
+            new[:capacity] = old
+            setattr(self, name, new)
+
+    def search(self, num_rollout=ROLLOUT, time_budget=None, chunk=256):
+        '''
+        Runs num_rollout rollouts, or as many as fit in time_budget seconds
+        (checked every chunk rollouts) if it is given.
+        '''
+        deadline = None if time_budget is None else perf_counter() + time_budget
+        num_rollouts = 0
+        while True:
+            if deadline is None:
+                if num_rollouts >= num_rollout:
+                    break
+                iterations = min(chunk, num_rollout - num_rollouts)
+            elif perf_counter() >= deadline:
+                break
+            else:
+                iterations = chunk
+            self.reserve(self.num_nodes + iterations*self.size*self.size)
+            self.num_nodes = run_search(self.N, self.Q, self.N_rave, self.Q_rave, self.move,
+                                        self.parent, self.first_child, self.num_children,
+                                        self.num_nodes, self.root_board, self.root_turn,
+                                        self.size, self.neighbours, iterations,
+                                        EXPLORE, RAVE_CONST)
+            num_rollouts += iterations
+        self.num_rollouts = num_rollouts
+
+    def best_move(self) -> tuple:
+        children = slice(self.first_child[0], self.first_child[0] + self.num_children[0])
+        visits = self.N[children]
+        best = np.flatnonzero(visits == visits.max())
+        return divmod(int(self.move[children][choice(best)]), self.size)
+
+
+class TreeParallelMCTSAgent(NumbaMCTSAgent):
+    '''
+    Tree-parallel variant where several threads descend one shared tree.
+    Selection with expansion and backpropagation run under a lock, so no
+    N/Q update is lost, and put virtual loss on the selected path so that
+    other threads spread to different branches. Playouts, the bulk of the
+    work, run outside the lock with the GIL released.
+    '''
+
+    def __init__(self, root_state: HexBase, threads=THREADS, virtual_loss=VIRTUAL_LOSS,
+                 capacity=GROW_CHUNK) -> None:
+        super().__init__(root_state, capacity)
+        self.threads = threads
+        self.virtual_loss = virtual_loss
+        self.lock = Lock()
+
+    def worker(self, num_rollout, deadline, seed_value):
+        seed(seed_value)
+        n = self.size*self.size
+        board = np.empty(n, dtype=np.int8)
+        parent = np.empty((2, n + 2), dtype=np.int64)
+        rank = np.empty((2, n + 2), dtype=np.int64)
+        while True:
+            with self.lock:
+                if deadline is None and self.num_rollouts >= num_rollout:
+                    return
+                if deadline is not None and perf_counter() >= deadline:
+                    return
+                self.num_rollouts += 1
+                self.reserve(self.num_nodes + n)
+                node, turn, winner, self.num_nodes = select_leaf(
+                    self.N, self.Q, self.N_rave, self.Q_rave, self.move, self.parent,
+                    self.first_child, self.num_children, self.num_nodes, self.root_board,
+                    self.root_turn, self.size, self.neighbours, board, parent, rank,
+                    EXPLORE, RAVE_CONST, self.virtual_loss)
+
+            if winner == EMPTY:
+                winner = playout(board, parent, rank, turn, self.size, self.neighbours)
+
+            with self.lock:
+                revert_virtual_loss(node, self.virtual_loss, self.N, self.Q, self.parent)
+                backpropagate(node, winner, turn, board, self.N, self.Q, self.N_rave,
+                              self.Q_rave, self.move, self.parent, self.first_child,
+                              self.num_children)
+
+    def search(self, num_rollout=ROLLOUT, time_budget=None):
+        '''
+        Runs num_rollout rollouts, or as many as fit in time_budget seconds
+        if it is given, spread over self.threads threads.
+        '''
+        deadline = None if time_budget is None else perf_counter() + time_budget
+        self.num_rollouts = 0
+        workers = [Thread(target=self.worker, args=(num_rollout, deadline, randrange(2**31)))
+                   for _ in range(self.threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+
+def compile_kernels():
+    '''
+    Loads the kernels from the on-disk cache, compiling them if needed,
+    by searching a tiny board.
+    '''
+    start = perf_counter()
+    NumbaMCTSAgent(HexBase(3)).search(8)
+    logging.info(f'Numba kernels ready in {(perf_counter()-start):.3f}s.')
+
+
+def best_move(board: Hex, agent_cls=NumbaMCTSAgent):
+    board = board.get_base()
+    agent = agent_cls(board)
+    start = perf_counter()
+    agent.search()
+    best_move = agent.best_move()
+    logging.info(f'Completed {agent.num_rollouts} rollouts in {(perf_counter()-start):.3f}s.')
+    return best_move
+
+
+HexAgent('MCTS-numba', best_move, description='MCTS with numba compiled kernels',
+         setup_func=compile_kernels, seed_func=seed)
+HexAgent('MCTS-tree-parallel', partial(best_move, agent_cls=TreeParallelMCTSAgent),
+         description=f'tree-parallel numba MCTS over {THREADS} threads',
+         setup_func=compile_kernels, seed_func=seed)
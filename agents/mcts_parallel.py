@@ -0,0 +1,129 @@
+"""
+Root-parallel MCTS.
+
+Every worker process builds its own tree from the same position with its
+own seed, then the root children statistics of all trees are summed and
+the most visited move is played. The process pool is kept alive between
+moves.
+"""
+import atexit
+import logging
+import random
+from multiprocessing import Pool
+from time import perf_counter
+
+import numpy as np
+from hex.agent import HexAgent
+from hex.board import Hex, HexBase
+
+from agents.mcts import ROLLOUT, ROOT, MCTSAgent
+
+WORKERS = 4
+WORKER_ROLLOUT = ROLLOUT // WORKERS
+
+
+def worker_search(args):
+    '''
+    Runs an independent search in a worker and returns the statistics of
+    the root children as {move: (N, Q, N_rave, Q_rave)}.
+    '''
+    state, num_rollout, seed = args
+    random.seed(seed)
+    agent = MCTSAgent(state)
+    agent.rng = np.random.default_rng(seed)
+    agent.search(num_rollout)
+    tree = agent.tree
+    children = tree.children(ROOT)
+    return {agent.cell(child): (int(tree.N[child]), float(tree.Q[child]),
+                                int(tree.N_rave[child]), float(tree.Q_rave[child]))
+            for child in range(children.start, children.stop)}
+
+
+def merge_stats(results):
+    '''
+    Sums the root children statistics returned by the workers.
+    '''
+    merged = {}
+    for stats in results:
+        for move, values in stats.items():
+            if move in merged:
+                merged[move] = tuple(a + b for a, b in zip(merged[move], values))
+            else:
+                merged[move] = values
+    return merged
+
+
+class RootParallelMCTS:
+    '''
+    Owns the worker pool and runs root-parallel searches on it.
+
+    Attributes:
+        workers (int): number of worker processes (and trees)
+        worker_rollout (int): rollouts run by each worker per move
+        stats (dict): merged root children statistics of the last search
+    '''
+
+    def __init__(self, workers=WORKERS, worker_rollout=WORKER_ROLLOUT, seed=None) -> None:
+        self.workers = workers
+        self.worker_rollout = worker_rollout
+        self.rng = random.Random(seed)
+        self.pool = Pool(workers)
+        self.stats = {}
+
+    def search(self, state: HexBase):
+        tasks = [(state, self.worker_rollout, self.rng.getrandbits(32))
+                 for _ in range(self.workers)]
+        self.stats = merge_stats(self.pool.map(worker_search, tasks))
+
+    def best_move(self) -> tuple:
+        most_visits = max(values[0] for values in self.stats.values())
+        return self.rng.choice([move for move, values in self.stats.items()
+                                if values[0] == most_visits])
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+
+_searcher = None
+
+
+def start_pool(workers=WORKERS, worker_rollout=WORKER_ROLLOUT, seed=None):
+    '''
+    (Re)creates the shared RootParallelMCTS used by the registered agent.
+    '''
+    global _searcher
+    if _searcher is not None:
+        _searcher.close()
+    _searcher = RootParallelMCTS(workers, worker_rollout, seed)
+    return _searcher
+
+
+@atexit.register
+def stop_pool():
+    global _searcher
+    if _searcher is not None:
+        _searcher.close()
+        _searcher = None
+
+
+def seed(value):
+    '''
+    Seeds the shared searcher, which draws the seeds of the worker trees.
+    '''
+    searcher = _searcher if _searcher is not None else start_pool()
+    searcher.rng.seed(value)
+
+
+def best_move(board: Hex):
+    searcher = _searcher if _searcher is not None else start_pool()
+    start = perf_counter()
+    searcher.search(board.get_base())
+    logging.info(f'Completed {searcher.workers}x{searcher.worker_rollout} rollouts '
+                 f'in {(perf_counter()-start):.3f}s.')
+    return searcher.best_move()
+
+
+HexAgent('MCTS-root-parallel', best_move,
+         description=f'root-parallel MCTS over {WORKERS} processes',
+         setup_func=start_pool, seed_func=seed)
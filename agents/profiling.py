@@ -0,0 +1,99 @@
+"""
+Per-phase statistics of an MCTS search.
+
+MCTSAgent records into a SearchStats only when it is given one, so the
+search pays nothing for it otherwise. Counters add up over searches until
+reset(), agents.mcts.best_move resets them after every move and can append
+them to a JSON lines file.
+"""
+import json
+from time import perf_counter
+
+
+class SearchStats:
+    '''
+    Counters and timers of the phases of MCTS iterations.
+
+    Attributes:
+        iterations (int): selected leaves
+        rollouts (int): playouts, more than iterations with batch rollouts
+        select_time, expand_time, rollout_time, backprop_time (float): seconds
+            spent in each phase, selection excluding the expansion it triggers
+        depth_total, depth_max (int): moves played from the root to reach the
+            selected leaves
+        expansions (int): nodes expanded
+        rollout_moves, rollout_max (int): moves played by the playouts
+        nodes_allocated (int): tree nodes created
+        peak_nodes (int): largest number of nodes in the tree
+        peak_tree_bytes (int): largest memory held by the tree arrays
+    '''
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self):
+        self.started = perf_counter()
+        self.iterations = 0
+        self.rollouts = 0
+        self.select_time = 0.0
+        self.expand_time = 0.0
+        self.rollout_time = 0.0
+        self.backprop_time = 0.0
+        self.depth_total = 0
+        self.depth_max = 0
+        self.expansions = 0
+        self.rollout_moves = 0
+        self.rollout_max = 0
+        self.nodes_allocated = 0
+        self.peak_nodes = 0
+        self.peak_tree_bytes = 0
+
+    def add_depth(self, depth):
+        self.iterations += 1
+        self.depth_total += depth
+        if depth > self.depth_max:
+            self.depth_max = depth
+
+    def add_rollout(self, moves, count=1):
+        self.rollouts += count
+        self.rollout_moves += moves * count
+        if moves > self.rollout_max:
+            self.rollout_max = moves
+
+    def add_tree(self, tree):
+        if tree.num_nodes > self.peak_nodes:
+            self.peak_nodes = tree.num_nodes
+        tree_bytes = tree.nbytes
+        if tree_bytes > self.peak_tree_bytes:
+            self.peak_tree_bytes = tree_bytes
+
+    def as_dict(self):
+        '''
+        The counters with per-iteration means and the share of the time
+        spent in each phase.
+        '''
+        phases = {'select': self.select_time, 'expand': self.expand_time,
+                  'rollout': self.rollout_time, 'backprop': self.backprop_time}
+        total = sum(phases.values())
+        return {
+            'iterations': self.iterations,
+            'rollouts': self.rollouts,
+            'wall_time': perf_counter() - self.started,
+            'phase_time': phases,
+            'phase_share': {phase: (time / total if total else 0.0) for phase, time in phases.items()},
+            'depth_mean': self.depth_total / self.iterations if self.iterations else 0.0,
+            'depth_max': self.depth_max,
+            'expansions': self.expansions,
+            'rollout_length_mean': self.rollout_moves / self.rollouts if self.rollouts else 0.0,
+            'rollout_length_max': self.rollout_max,
+            'nodes_allocated': self.nodes_allocated,
+            'peak_nodes': self.peak_nodes,
+            'peak_tree_bytes': self.peak_tree_bytes,
+        }
+
+    def dump(self, path, **extra):
+        '''
+        Appends the statistics and the extra fields as one JSON line to path.
+        '''
+        with open(path, 'a') as file:
+            file.write(json.dumps({**extra, **self.as_dict()}) + '\n')
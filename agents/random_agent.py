@@ -1,11 +1,9 @@
-from random import choice
-
 from hex.agent import HexAgent
-from hex.board import Hex, possible_moves
+from hex.board import Hex
 
 
 def best_move(board: Hex):
-    return choice(possible_moves(board.size, board.board))
+    return board.random_move()
 
 
 HexAgent('random', best_move, description='plays random moves')
@@ -0,0 +1,95 @@
+"""
+Batch rollouts with NumPy.
+
+A filled Hex board always has exactly one winner and random play until the
+game ends gives the same winner distribution as filling every empty cell at
+random. So K rollouts are done as K random fills of the empty cells followed
+by one vectorized flood fill per batch to find which player connected.
+"""
+from typing import NamedTuple
+
+import numpy as np
+from hex.board import EMPTY, P1, P2
+
+
+class RolloutResult(NamedTuple):
+    """
+    Attributes:
+        wins (dict): Number of rollouts won by each player
+        amaf_visits (dict): NxN array per player, number of rollouts in which the player played the cell
+        amaf_wins (dict): NxN array per player, number of those rollouts the player won
+    """
+    wins: dict
+    amaf_visits: dict
+    amaf_wins: dict
+
+
+def fill_boards(board, turn, k, rng):
+    """
+    Returns K copies of board, shape (K, N, N), with the empty cells filled
+    by a random permutation of alternating moves starting with turn.
+    """
+    flat = board.ravel()
+    empties = np.flatnonzero(flat == EMPTY)
+    num_empty = len(empties)
+
+    # Stones in play order, the player to move places the extra one.
+    stones = np.full(num_empty, -turn, dtype=np.int8)
+    stones[:(num_empty + 1) // 2] = turn
+    order = rng.random((k, num_empty)).argsort(axis=1)
+
+    boards = np.tile(flat.astype(np.int8), (k, 1))
+    boards[:, empties] = stones[order]
+    return boards.reshape(k, *board.shape)
+
+
+def p1_connected(boards):
+    """
+    Vectorized flood fill from the first row through P1 stones.
+    Returns a boolean array telling for each board if P1 reached the last row.
+    """
+    stones = boards == P1
+    reach = np.zeros_like(stones)
+    reach[:, 0, :] = stones[:, 0, :]
+    while True:
+        grown = reach.copy()
+        grown[:, 1:, :] |= reach[:, :-1, :]
+        grown[:, 1:, :-1] |= reach[:, :-1, 1:]
+        grown[:, :, 1:] |= reach[:, :, :-1]
+        grown[:, :, :-1] |= reach[:, :, 1:]
+        grown[:, :-1, 1:] |= reach[:, 1:, :-1]
+        grown[:, :-1, :] |= reach[:, 1:, :]
+        grown &= stones
+        if np.array_equal(grown, reach):
+            return reach[:, -1, :].any(axis=1)
+        reach = grown
+
+
+def batch_rollout(board, turn, k, rng=None):
+    """
+    Plays K random rollouts from the position.
+
+    Args:
+        board (np.ndarray): NxN board of the position
+        turn (int): player to move
+        k (int): number of rollouts
+        rng (np.random.Generator): random generator, a fresh one if None
+
+    Returns:
+        RolloutResult with win counts and per-cell AMAF statistics over the
+        cells filled by the rollouts.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    boards = fill_boards(board, turn, k, rng)
+    p1_won = p1_connected(boards)
+    played = board == EMPTY
+
+    wins = {P1: int(p1_won.sum()), P2: int(k - p1_won.sum())}
+    amaf_visits = {}
+    amaf_wins = {}
+    for player, won in ((P1, p1_won), (P2, ~p1_won)):
+        owned = (boards == player) & played
+        amaf_visits[player] = owned.sum(axis=0)
+        amaf_wins[player] = owned[won].sum(axis=0)
+    return RolloutResult(wins, amaf_visits, amaf_wins)
@@ -0,0 +1,82 @@
+"""
+Transposition table for MCTS.
+
+In Hex the position does not depend on move order, so the same position is
+reached through many paths of the search tree. The table keys N/Q
+statistics by the Zobrist hash of the position (HexBase.hash), so all tree
+nodes of one position share them.
+"""
+import sys
+from collections import OrderedDict
+
+# About 270 bytes an entry as measured by nbytes, so some 70 MB when full.
+TT_ENTRIES = 1 << 18
+
+
+class TranspositionTable:
+    '''
+    Bounded map from position hash to [N, Q], evicting the least recently
+    used entry when full.
+
+    Attributes:
+        max_entries (int): number of positions kept
+        lookups, hits, stores, evictions (int): usage counters, a hit is a
+            lookup answered with more visits than the tree node asking has,
+            i.e. search it gains from a transposed move order
+    '''
+
+    def __init__(self, max_entries=TT_ENTRIES) -> None:
+        self.max_entries = max(1, max_entries)
+        self.entries = OrderedDict()
+        self.lookups = 0
+        self.hits = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def get(self, key, visits=0):
+        '''
+        Returns [N, Q] of the position if it holds more than visits visits,
+        else None. Most entries were stored by the asking node itself.
+        '''
+        self.lookups += 1
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.entries.move_to_end(key)
+        if entry[0] <= visits:
+            return None
+        self.hits += 1
+        return entry
+
+    def update(self, key, visits, reward):
+        entry = self.entries.get(key)
+        if entry is None:
+            if len(self.entries) >= self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+            self.entries[key] = [visits, reward]
+            self.stores += 1
+        else:
+            entry[0] += visits
+            entry[1] += reward
+            self.entries.move_to_end(key)
+
+    def nbytes(self):
+        '''
+        Memory held by the table as reported by sys.getsizeof: the ordered
+        dict itself and the key, list and numbers of every entry.
+        '''
+        return sys.getsizeof(self.entries) + sum(
+            sys.getsizeof(key) + sys.getsizeof(entry) + sys.getsizeof(entry[0]) + sys.getsizeof(entry[1])
+            for key, entry in self.entries.items())
+
+    def stats(self):
+        return {'entries': len(self.entries), 'lookups': self.lookups, 'hits': self.hits,
+                'hit_rate': self.hit_rate, 'stores': self.stores, 'evictions': self.evictions}
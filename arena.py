@@ -0,0 +1,246 @@
+"""
+Headless arena playing registered agents against each other.
+
+Games run in parallel worker processes. The two agents swap colours every
+game and game i is played with the seed seed + i, which also seeds the
+agents, so a match is reproducible whatever the number of workers. Only
+the tree-parallel agent is not, its threads share one tree. The report gives the win rate
+of the first agent with a Wilson confidence interval, the matching Elo
+difference and the per-move latency of each agent.
+
+    python arena.py MCTS random --games 20 --size 6
+    python arena.py MCTS MCTS-bitboard --games 100 --workers 4 --save --json match.json
+    python arena.py MCTS MCTS --games 10000 --workers 8 --corpus db/corpus
+    python arena.py MCTS-numba MCTS --modules agents.mcts_numba
+"""
+import argparse
+import json
+import logging
+import random
+from concurrent.futures import ProcessPoolExecutor
+from importlib import import_module
+from math import log10, sqrt
+from time import perf_counter
+
+import numpy as np
+from tabulate import tabulate
+
+from db.corpus import CorpusWriter
+from db.game_storage_api import DATAFILE_PATH, DB_PATH, TABLE_NAME, GameSaver
+from hex.agent import HexAgent
+from hex.board import P1, P2, Hex, player
+
+# Modules registering the agents that can play in the arena.
+AGENT_MODULES = ('agents.random_agent', 'agents.mcts')
+BOARD_SIZE = 6
+# z of a two-sided 95% confidence interval.
+Z_95 = 1.96
+
+
+def load_agents(modules, names):
+    '''
+    Imports the modules registering agents and sets up the named agents.
+    Runs in every worker process.
+    '''
+    for module in modules:
+        import_module(module)
+    for name in set(names):
+        HexAgent.setup(name)
+
+
+def play_game(task):
+    '''
+    Plays one game between two agents. Returns the names of the players,
+    the winner, the moves and the seconds every move took.
+    '''
+    index, name_1, name_2, size, seed = task
+    random.seed(seed)
+    np.random.seed(seed)
+    for name in (name_1, name_2):
+        HexAgent.get_agent(name).seed(seed)
+    game = Hex(size, player(name_1, True), player(name_2, True))
+    latencies = []
+    while game.winner is None:
+        agent = HexAgent.get_agent(game.current_player)
+        start = perf_counter()
+        move = agent.best_move(game)
+        latencies.append(perf_counter() - start)
+        game.step(move)
+    return {'index': index, 'seed': seed, 'size': size,
+            'player_1': name_1, 'player_2': name_2, 'first_wins': game.winner == P1,
+            'winner': game.players[game.winner].name, 'winner_legend': game.legend[game.winner],
+            'moves': [list(move) for move in game.move_history], 'latencies': latencies}
+
+
+def wilson_interval(wins, games, z=Z_95):
+    '''
+    Wilson score interval of a win rate.
+    '''
+    if games == 0:
+        return 0.0, 1.0
+    rate = wins / games
+    centre = (rate + z*z/(2*games)) / (1 + z*z/games)
+    margin = z*sqrt(rate*(1 - rate)/games + z*z/(4*games*games)) / (1 + z*z/games)
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def elo_difference(rate):
+    '''
+    Elo difference matching an expected score, None when it is 0 or 1.
+    '''
+    if rate <= 0 or rate >= 1:
+        return None
+    return -400 * log10(1/rate - 1)
+
+
+def latency_summary(latencies):
+    if not latencies:
+        return {}
+    latencies = np.array(latencies)
+    return {'moves': len(latencies), 'mean': float(latencies.mean()),
+            'median': float(np.median(latencies)), 'p95': float(np.percentile(latencies, 95)),
+            'max': float(latencies.max())}
+
+
+def summarize(name_a, name_b, results):
+    '''
+    Aggregates game results into win rates, confidence interval, Elo and
+    per-agent move latency. Agent A moves first in the even games, which
+    tells the two sides apart in self-play.
+    '''
+    if name_a == name_b:
+        name_a, name_b = f'{name_a} (A)', f'{name_b} (B)'
+    games = len(results)
+    latencies = {name_a: [], name_b: []}
+    as_first = {name_a: [0, 0], name_b: [0, 0]}
+    wins = 0
+    for result in results:
+        first, second = (name_a, name_b) if result['index'] % 2 == 0 else (name_b, name_a)
+        wins += (first == name_a) == result['first_wins']
+        as_first[first][0] += result['first_wins']
+        as_first[first][1] += 1
+        for move_number, latency in enumerate(result['latencies']):
+            latencies[first if move_number % 2 == 0 else second].append(latency)
+    rate = wins / games if games else 0.0
+    low, high = wilson_interval(wins, games)
+    return {
+        'agents': [name_a, name_b],
+        'games': games,
+        'wins': {name_a: wins, name_b: games - wins},
+        'win_rate': rate,
+        'win_rate_ci95': [low, high],
+        'elo': elo_difference(rate),
+        'elo_ci95': [elo_difference(low), elo_difference(high)],
+        'first_player_wins': {name: {'wins': won, 'games': played}
+                              for name, (won, played) in as_first.items()},
+        'latency': {name: latency_summary(values) for name, values in latencies.items()},
+    }
+
+
+def run_match(name_a, name_b, games, size=BOARD_SIZE, workers=1, seed=0, modules=AGENT_MODULES):
+    '''
+    Plays games between two agents, alternating who moves first, and
+    returns the game results in game order.
+    '''
+    tasks = [(index, *((name_a, name_b) if index % 2 == 0 else (name_b, name_a)), size, seed + index)
+             for index in range(games)]
+    if workers <= 1:
+        load_agents(modules, (name_a, name_b))
+        results = []
+        for task in tasks:
+            results.append(play_game(task))
+            logging.info(f'Game {task[0]} won by {results[-1]["winner"]}')
+        return results
+
+    with ProcessPoolExecutor(workers, initializer=load_agents,
+                             initargs=(modules, (name_a, name_b))) as executor:
+        return list(executor.map(play_game, tasks))
+
+
+def save_results(results, saver: GameSaver):
+    '''
+    Stores all games of a match with one database transaction.
+    '''
+    return saver.save_many([(result['player_1'], result['player_2'], result['winner_legend'], True,
+                             [tuple(move) for move in result['moves']], result['size'])
+                            for result in results])
+
+
+def append_to_corpus(results, writer: CorpusWriter, ids=None):
+    '''
+    Appends the games of a match to a corpus, under their database ids if
+    they were saved, else under minus one minus their position in the
+    corpus, which no database id collides with.
+    '''
+    if ids is None:
+        ids = range(-writer.num_games - 1, -writer.num_games - len(results) - 1, -1)
+    writer.append([(id, [tuple(move) for move in result['moves']], result['size'],
+                    P1 if result['first_wins'] else P2, result['player_1'], result['player_2'], True)
+                   for id, result in zip(ids, results)])
+
+
+def print_summary(summary):
+    name_a, name_b = summary['agents']
+    low, high = summary['win_rate_ci95']
+    elo = summary['elo']
+    elo_low, elo_high = summary['elo_ci95']
+
+    def fmt(value):
+        return 'n/a' if value is None else f'{round(value) + 0:+d}'
+
+    print(f'{name_a} vs {name_b}: {summary["wins"][name_a]}-{summary["wins"][name_b]} '
+          f'in {summary["games"]} games')
+    print(f'{name_a} win rate {summary["win_rate"]:.3f} (95% CI {low:.3f}-{high:.3f}), '
+          f'Elo {fmt(elo)} (95% CI {fmt(elo_low)} to {fmt(elo_high)})')
+    rows = []
+    for name in (name_a, name_b):
+        first = summary['first_player_wins'][name]
+        latency = summary['latency'][name]
+        rows.append([name, f'{first["wins"]}/{first["games"]}', latency.get('moves', 0),
+                     latency.get('mean'), latency.get('median'), latency.get('p95'), latency.get('max')])
+    print(tabulate(rows, floatfmt='.4f', tablefmt='orgtbl',
+                   headers=['agent', 'wins as first', 'moves', 'mean s', 'median s', 'p95 s', 'max s']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Play registered Hex agents against each other.')
+    parser.add_argument('agent_a')
+    parser.add_argument('agent_b')
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('--size', type=int, default=BOARD_SIZE)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--modules', nargs='*', default=[],
+                        help='extra modules registering agents, e.g. agents.mcts_numba')
+    parser.add_argument('--save', action='store_true', help='store the games in the game database')
+    parser.add_argument('--corpus', help='append the games to the corpus in this directory')
+    parser.add_argument('--json', help='write the summary and the games to this file')
+    args = parser.parse_args(argv)
+
+    modules = (*AGENT_MODULES, *args.modules)
+    load_agents(modules, ())
+    for name in (args.agent_a, args.agent_b):
+        HexAgent.get_agent(name)
+
+    start = perf_counter()
+    results = run_match(args.agent_a, args.agent_b, args.games, args.size, args.workers,
+                        args.seed, modules)
+    summary = summarize(args.agent_a, args.agent_b, results)
+    summary['seconds'] = perf_counter() - start
+    print_summary(summary)
+    print(f'{args.games} games in {summary["seconds"]:.1f}s')
+
+    ids = None
+    if args.save:
+        ids = save_results(results, GameSaver(DB_PATH, TABLE_NAME, DATAFILE_PATH))
+        print(f'Saved as games {ids[0]}-{ids[-1]}.')
+    if args.corpus:
+        append_to_corpus(results, CorpusWriter(args.corpus), ids)
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump({'summary': summary, 'games': results}, file, indent=1)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+    main()
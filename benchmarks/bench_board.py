@@ -0,0 +1,45 @@
+"""
+Copies and steps per second of HexBase against HexBitBoard.
+
+    python -m benchmarks.bench_board
+"""
+from copy import deepcopy
+
+from hex.board import HexBase, HexBitBoard
+from tabulate import tabulate
+
+from benchmarks.common import per_second, random_position
+
+SIZES = (6, 8, 11, 13)
+
+
+def bench_state(state_cls, size):
+    state, moves = random_position(size, state_cls=state_cls)
+
+    def play_out():
+        curr_state = state.copy()
+        for move in moves:
+            curr_state.step(move)
+
+    copies = per_second(state.copy)
+    # A play out is one copy plus len(moves) steps.
+    steps = per_second(play_out) * len(moves)
+    return copies, steps
+
+
+def main():
+    rows = []
+    for size in SIZES:
+        base, _ = random_position(size)
+        deep_copies = per_second(lambda: deepcopy(base))
+        base_copies, base_steps = bench_state(HexBase, size)
+        bit_copies, bit_steps = bench_state(HexBitBoard, size)
+        rows.append([size, deep_copies, base_copies, bit_copies, base_steps, bit_steps])
+
+    print(tabulate(rows, floatfmt='.0f', tablefmt='orgtbl',
+                   headers=['size', 'deepcopy/s', 'HexBase copy/s', 'HexBitBoard copy/s',
+                            'HexBase step/s', 'HexBitBoard step/s']))
+
+
+if __name__ == '__main__':
+    main()
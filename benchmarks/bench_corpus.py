@@ -0,0 +1,76 @@
+"""
+Game corpus at scale: append rate, random access to a game by id and
+streaming over all games, with the memory the reader process holds.
+
+    python -m benchmarks.bench_corpus [number of games]
+"""
+import random
+import resource
+import sys
+import tempfile
+from time import perf_counter
+
+import numpy as np
+from db.corpus import CorpusReader, CorpusWriter
+from hex.board import P1, P2
+from tabulate import tabulate
+
+GAMES = 200_000
+SIZE = 11
+BATCH = 10_000
+
+
+def random_games(count, first_id, rng):
+    '''
+    Games of random lengths over random cells, enough for storage timings.
+    '''
+    games = []
+    for game_id in range(first_id, first_id + count):
+        length = int(rng.integers(SIZE, SIZE*SIZE))
+        cells = rng.permutation(SIZE*SIZE)[:length].tolist()
+        games.append((game_id, [divmod(cell, SIZE) for cell in cells], SIZE,
+                      P1 if length % 2 else P2, 'MCTS', 'MCTS', True))
+    return games
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    num_games = int(sys.argv[1]) if len(sys.argv) > 1 else GAMES
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as directory:
+        writer = CorpusWriter(directory + '/corpus')
+        append_time = 0.0
+        for first_id in range(0, num_games, BATCH):
+            games = random_games(min(BATCH, num_games - first_id), first_id, rng)
+            start = perf_counter()
+            writer.append(games)
+            append_time += perf_counter() - start
+        del games
+        rss_before = max_rss_mb()
+
+        reader = CorpusReader(directory + '/corpus')
+        ids = random.Random(0).sample(range(num_games), 1000)
+        start = perf_counter()
+        for game_id in ids:
+            reader.get(game_id)
+        get_time = (perf_counter() - start) / len(ids)
+
+        start = perf_counter()
+        moves = 0
+        for meta, offsets, chunk_moves in reader.chunks():
+            moves += int(np.count_nonzero(chunk_moves >= 0))
+        scan_time = perf_counter() - start
+
+        print(tabulate([[num_games, reader.num_moves, num_games / append_time, get_time * 1e6,
+                         moves / scan_time / 1e6, rss_before, max_rss_mb()]],
+                       floatfmt='.1f', tablefmt='orgtbl',
+                       headers=['games', 'moves', 'appended games/s', 'get by id us',
+                                'streamed M moves/s', 'max RSS MB before read',
+                                'max RSS MB after read']))
+
+
+if __name__ == '__main__':
+    main()
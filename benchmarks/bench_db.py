@@ -0,0 +1,84 @@
+"""
+Games table at scale: inserting games one commit each against one
+transaction for all, looking games up by player with and without the
+player indexes, and reading the whole table in pages.
+
+    python -m benchmarks.bench_db [number of games]
+"""
+import random
+import sys
+import tempfile
+from time import perf_counter
+
+from db.db_api import game_db_api
+from db.game_storage_api import TABLE_NAME
+from tabulate import tabulate
+
+GAMES = 1_000_000
+BATCH = 10_000
+SINGLE = 1000
+PLAYERS = 1000
+LOOKUPS = 200
+
+
+def random_games(count, rng):
+    '''
+    Games between random players, one in four against an agent.
+    '''
+    games = []
+    for _ in range(count):
+        agent = rng.random() < 0.25
+        player_1 = 'MCTS' if agent else f'player_{rng.randrange(PLAYERS)}'
+        player_2 = f'player_{rng.randrange(PLAYERS)}'
+        games.append((player_1, player_2, rng.choice(('player_1', 'player_2')), agent))
+    return games
+
+
+def time_lookups(api, usernames):
+    start = perf_counter()
+    for username in usernames:
+        api.get_game_by_username(username).fetchall()
+    return (perf_counter() - start) / len(usernames)
+
+
+def main():
+    num_games = int(sys.argv[1]) if len(sys.argv) > 1 else GAMES
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        api = game_db_api(directory + '/games.db', TABLE_NAME)
+
+        games = random_games(SINGLE, rng)
+        start = perf_counter()
+        for game in games:
+            api.add_game(*game)
+        single_rate = SINGLE / (perf_counter() - start)
+
+        bulk_time = 0.0
+        for done in range(SINGLE, num_games, BATCH):
+            games = random_games(min(BATCH, num_games - done), rng)
+            start = perf_counter()
+            api.add_games_bulk(games)
+            bulk_time += perf_counter() - start
+        bulk_rate = (num_games - SINGLE) / bulk_time if bulk_time else 0.0
+
+        usernames = [f'player_{rng.randrange(PLAYERS)}' for _ in range(LOOKUPS)]
+        indexed = time_lookups(api, usernames)
+
+        start = perf_counter()
+        rows = sum(1 for _ in api.iter_games())
+        page_rate = rows / (perf_counter() - start)
+
+        for column in ('player_1', 'player_2'):
+            api.db.execute(f'DROP INDEX {TABLE_NAME}_{column}')
+        unindexed = time_lookups(api, usernames[:max(1, LOOKUPS // 20)])
+        api.db.close()
+
+    print(tabulate([[num_games, single_rate, bulk_rate, bulk_rate / single_rate, indexed * 1e3,
+                     unindexed * 1e3, page_rate]],
+                   floatfmt='.1f', tablefmt='orgtbl',
+                   headers=['games', 'add_game games/s', 'add_games_bulk games/s', 'speedup',
+                            'by player ms (indexed)', 'by player ms (no index)', 'paged rows/s']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+shortest_connection on finished games, the old dict graph BFS against the
+flat array one, and the cost of the connection distances used as an MCTS
+prior on half filled boards.
+
+    python -m benchmarks.bench_distance
+"""
+from hex.board import (P1, P2, connection_distance, shortest_connection,
+                       shortest_path_cells)
+from tabulate import tabulate
+
+from benchmarks.common import per_second, random_position
+from benchmarks.reference import queue_shortest_connection
+from benchmarks.suite import finished_game
+
+SIZES = (6, 8, 11, 13, 19)
+
+
+def main():
+    rows = []
+    for size in SIZES:
+        game = finished_game(size, 0)
+        board, winner = game.board, game.winner
+        position, _ = random_position(size)
+
+        rows.append([size,
+                     per_second(lambda: queue_shortest_connection(board, size, winner)),
+                     per_second(lambda: shortest_connection(board, size, winner)),
+                     per_second(lambda: connection_distance(position.board, size, P1)),
+                     per_second(lambda: shortest_path_cells(position.board, size, P1)
+                                | shortest_path_cells(position.board, size, P2))])
+
+    print(tabulate(rows, floatfmt='.0f', tablefmt='orgtbl',
+                   headers=['size', 'before shortest_connection/s', 'shortest_connection/s',
+                            'connection_distance/s', 'MCTS prior/s']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Full random games per second, with the winner read after every move as
+the playout loops do: the winner property checking both players' edges
+against the winner cached by step.
+
+    python -m benchmarks.bench_games
+"""
+import random
+
+from hex.board import HexBase, HexBitBoard
+from tabulate import tabulate
+
+from benchmarks.common import per_second
+from benchmarks.reference import PropertyWinnerHexBase
+
+SIZES = (6, 8, 11, 13, 19)
+
+
+def random_game(state_cls, size):
+    state = state_cls(size)
+    while state.winner is None:
+        state.step(state.random_move())
+
+
+def main():
+    rows = []
+    for size in SIZES:
+        row = [size]
+        for state_cls in (PropertyWinnerHexBase, HexBase, HexBitBoard):
+            random.seed(0)
+            row.append(per_second(lambda: random_game(state_cls, size), min_time=0.5))
+        rows.append(row)
+
+    print(tabulate(rows, floatfmt='.0f', tablefmt='orgtbl',
+                   headers=['size', 'winner property games/s', 'HexBase games/s',
+                            'HexBitBoard games/s']))
+
+
+if __name__ == '__main__':
+    main()
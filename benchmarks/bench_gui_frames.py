@@ -0,0 +1,76 @@
+"""
+Seconds per move of the game window, drawing the whole figure after every
+stone as HexGUI did before against its blitted refresh, over random games
+on the Agg backend.
+
+    python -m benchmarks.bench_gui_frames
+"""
+from time import perf_counter
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+import numpy as np
+from hex.board import Hex
+from hex.gui.draw_board import HexPlot, add_piece
+from hex.gui.hex_gui import HexGUI
+from tabulate import tabulate
+
+from benchmarks.suite import finished_game
+
+SIZES = (6, 11, 13, 19)
+
+
+def full_redraw_times(size, moves):
+    fig, ax, _ = HexPlot(size)
+    fig.canvas.draw()
+    times = []
+    for number, move in enumerate(moves):
+        add_piece(ax, move, 1 if number % 2 == 0 else -1)
+        fig.suptitle(f'Move {number}')
+        start = perf_counter()
+        fig.canvas.draw()
+        fig.canvas.flush_events()
+        times.append(perf_counter() - start)
+    plt.close(fig)
+    return np.array(times)
+
+
+def blit_times(size, moves):
+    game = Hex(size)
+    gui = HexGUI(game, measure_frames=True)
+    gui.refresh()
+    gui.frame_times.clear()
+    for move in moves:
+        turn = game.turn
+        game.step(move)
+        gui.set_status(f'Move {len(game.move_history)}')
+        gui.show_move(move, turn)
+    image = np.asarray(gui.fig.canvas.buffer_rgba()).copy()
+    times = np.array(gui.frame_times)
+
+    # The blitted image has to match a full redraw of the same figure.
+    gui.redraw()
+    same = np.array_equal(image, np.asarray(gui.fig.canvas.buffer_rgba()))
+    plt.close(gui.fig)
+    return times, same
+
+
+def main():
+    rows = []
+    for size in SIZES:
+        moves = finished_game(size, 0).move_history
+        full = full_redraw_times(size, moves)
+        blit, same = blit_times(size, moves)
+        rows.append([size, len(moves), np.median(full) * 1e3, np.median(blit) * 1e3,
+                     np.percentile(blit, 95) * 1e3, np.median(full) / np.median(blit), same])
+
+    print(tabulate(rows, floatfmt='.2f', tablefmt='orgtbl',
+                   headers=['size', 'moves', 'full redraw ms', 'blit ms', 'blit p95 ms', 'speedup',
+                            'same image']))
+
+
+if __name__ == '__main__':
+    main()
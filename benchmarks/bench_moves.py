@@ -0,0 +1,53 @@
+"""
+Legal move handling in a random playout: scanning the board for empty cells
+and removing the played one from a list, against the incremental empty
+cell set of the state.
+
+    python -m benchmarks.bench_moves
+"""
+from random import choice
+
+from hex.board import HexBase, HexBitBoard, possible_moves
+from tabulate import tabulate
+
+from benchmarks.common import per_second, random_position
+
+SIZES = (6, 8, 11, 13, 19)
+
+
+def playout_list(state):
+    curr_state = state.copy()
+    legal_moves = possible_moves(curr_state.size, curr_state.board)
+    while curr_state.winner is None:
+        move = choice(legal_moves)
+        curr_state.step(move)
+        legal_moves.remove(move)
+
+
+def playout_set(state):
+    curr_state = state.copy()
+    while curr_state.winner is None:
+        curr_state.step(curr_state.random_move())
+
+
+def main():
+    rows = []
+    for size in SIZES:
+        row = [size]
+        for state_cls in (HexBase, HexBitBoard):
+            state, _ = random_position(size, fill=0.2, state_cls=state_cls)
+            row.append(per_second(lambda: possible_moves(size, state.board)))
+            row.append(per_second(state.legal_moves))
+            row.append(per_second(lambda: playout_list(state)))
+            row.append(per_second(lambda: playout_set(state)))
+        rows.append(row)
+
+    print(tabulate(rows, floatfmt='.0f', tablefmt='orgtbl',
+                   headers=['size',
+                            'scan/s', 'legal_moves/s', 'list playouts/s', 'set playouts/s',
+                            'bit scan/s', 'bit legal_moves/s', 'bit list playouts/s',
+                            'bit set playouts/s']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""
+Rollouts per second of the pure-Python MCTSAgent against NumbaMCTSAgent.
+
+    python -m benchmarks.bench_numba
+"""
+from time import perf_counter
+
+from agents.mcts import MCTSAgent
+from agents.mcts_numba import NumbaMCTSAgent, compile_kernels
+from hex.board import HexBase
+from tabulate import tabulate
+
+SIZES = (6, 8, 11, 13)
+PYTHON_ROLLOUTS = 500
+NUMBA_ROLLOUTS = 20000
+
+
+def rollouts_per_second(agent, num_rollout):
+    start = perf_counter()
+    agent.search(num_rollout)
+    return num_rollout / (perf_counter() - start)
+
+
+def main():
+    compile_kernels()
+    rows = []
+    for size in SIZES:
+        python_rate = rollouts_per_second(MCTSAgent(HexBase(size)), PYTHON_ROLLOUTS)
+        numba_rate = rollouts_per_second(NumbaMCTSAgent(HexBase(size)), NUMBA_ROLLOUTS)
+        rows.append([size, python_rate, numba_rate, numba_rate / python_rate])
+
+    print(tabulate(rows, floatfmt='.0f', tablefmt='orgtbl',
+                   headers=['size', 'MCTSAgent rollouts/s', 'NumbaMCTSAgent rollouts/s', 'speedup']))
+
+
+if __name__ == '__main__':
+    main()
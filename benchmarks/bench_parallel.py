@@ -0,0 +1,45 @@
+"""
+Scaling of root-parallel MCTS with the number of worker processes.
+Every worker runs the same number of rollouts, so ideal scaling keeps the
+time per move flat while the total rollouts grow with the worker count.
+
+    python -m benchmarks.bench_parallel
+"""
+import os
+from time import perf_counter
+
+from agents.mcts_parallel import RootParallelMCTS
+from hex.board import HexBase
+from tabulate import tabulate
+
+WORKER_COUNTS = (1, 2, 4, 8, 16)
+WORKER_ROLLOUT = 500
+SIZE = 8
+MOVES = 3
+
+
+def main():
+    print(f'{os.cpu_count()} cpus, {SIZE}x{SIZE} board, {WORKER_ROLLOUT} rollouts per worker')
+    rows = []
+    single_rate = None
+    for workers in WORKER_COUNTS:
+        searcher = RootParallelMCTS(workers, WORKER_ROLLOUT, seed=0)
+        # Warm the pool up so that process start up is not timed.
+        searcher.search(HexBase(SIZE))
+
+        start = perf_counter()
+        for _ in range(MOVES):
+            searcher.search(HexBase(SIZE))
+        elapsed = (perf_counter() - start) / MOVES
+        searcher.close()
+
+        rate = workers * WORKER_ROLLOUT / elapsed
+        single_rate = single_rate or rate
+        rows.append([workers, elapsed, rate, rate / single_rate])
+
+    print(tabulate(rows, floatfmt=('.0f', '.3f', '.0f', '.2f'), tablefmt='orgtbl',
+                   headers=['workers', 's/move', 'rollouts/s', 'speedup']))
+
+
+if __name__ == '__main__':
+    main()
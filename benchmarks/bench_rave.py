@@ -0,0 +1,78 @@
+"""
+Backpropagation time per rollout of MCTSAgent against the object tree
+reference agent. tests/test_rave.py checks the RAVE updates themselves
+against benchmarks.reference.
+
+    python -m benchmarks.bench_rave
+"""
+import random
+from time import perf_counter
+
+import numpy as np
+from agents.mcts import MCTSAgent
+from hex.board import EMPTY, P1, P2
+from tabulate import tabulate
+
+from benchmarks.common import random_position
+from benchmarks.reference import ObjectTreeMCTSAgent
+
+SIZES = (6, 8, 11)
+FILLS = (0.0, 0.4)
+WARMUP_ROLLOUTS = 300
+ROLLOUTS = 300
+
+
+def backprop_time(agent, rollouts=ROLLOUTS, playout_lists=False):
+    '''
+    Average seconds spent in backpropagate per rollout. With playout_lists
+    the object tree agent scans lists of the stones played in the playout,
+    which is what correct AMAF costs with its list membership tests.
+    '''
+    agent.search(WARMUP_ROLLOUTS)
+    total = 0.0
+    for _ in range(rollouts):
+        node, state = agent.select_node()
+        turn = state.turn
+        simulation = agent.simulate(state)
+        if playout_lists:
+            before = state.board
+            after = simulation_board(state, simulation)
+            simulation = (simulation[0],
+                          *(list(zip(*np.nonzero((after == player) & (before == EMPTY))))
+                            for player in (P1, P2)))
+        start = perf_counter()
+        agent.backpropagate(node, simulation[0], turn, *simulation[1:])
+        total += perf_counter() - start
+    return total / rollouts
+
+
+def simulation_board(state, simulation):
+    '''
+    Replays a random fill of state for the playout lists, the object tree
+    agent does not report which stones its playout placed.
+    '''
+    board = state.board.copy()
+    empties = list(zip(*np.nonzero(board == EMPTY)))
+    random.shuffle(empties)
+    for number, cell in enumerate(empties):
+        board[cell] = state.turn if number % 2 == 0 else -state.turn
+    return board
+
+
+def main():
+    rows = []
+    for size in SIZES:
+        for fill in FILLS:
+            state, _ = random_position(size, fill)
+            rows.append([size, fill,
+                         backprop_time(ObjectTreeMCTSAgent(state)) * 1e6,
+                         backprop_time(ObjectTreeMCTSAgent(state), playout_lists=True) * 1e6,
+                         backprop_time(MCTSAgent(state)) * 1e6])
+
+    print(tabulate(rows, floatfmt='.1f', tablefmt='orgtbl',
+                   headers=['size', 'fill', 'object tree us/rollout (board stones)',
+                            'object tree us/rollout (playout stones)', 'owner array us/rollout']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""
+Rollouts per second of MCTSAgent.simulate against agents.rollout.batch_rollout.
+
+    python -m benchmarks.bench_rollout
+"""
+import numpy as np
+from agents.mcts import MCTSAgent
+from agents.rollout import batch_rollout
+from tabulate import tabulate
+
+from benchmarks.common import per_second, random_position
+
+SIZES = (6, 8, 11, 13)
+BATCH_SIZES = (16, 64, 256)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    rows = []
+    for size in SIZES:
+        state, _ = random_position(size, fill=0.2)
+        agent = MCTSAgent(state)
+        row = [size, per_second(lambda: agent.simulate(state))]
+        for k in BATCH_SIZES:
+            row.append(per_second(lambda: batch_rollout(state.board, state.turn, k, rng)) * k)
+        rows.append(row)
+
+    print(tabulate(rows, floatfmt='.0f', tablefmt='orgtbl',
+                   headers=['size', 'simulate/s', *(f'batch {k}/s' for k in BATCH_SIZES)]))
+
+
+if __name__ == '__main__':
+    main()
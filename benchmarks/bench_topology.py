@@ -0,0 +1,54 @@
+"""
+Steps per second with the neighbour list of a cell built on every move
+against the shared per-size Topology tables.
+
+    python -m benchmarks.bench_topology
+"""
+from hex.board import HexBase, HexBitBoard, neighbours, topology
+from tabulate import tabulate
+
+from benchmarks.common import per_second, random_position
+from benchmarks.reference import NeighbourListHexBase
+
+SIZES = (6, 8, 11, 13, 19)
+
+
+def steps_per_second(state_cls, size, moves):
+    def play():
+        state = state_cls(size)
+        for move in moves:
+            state.step(move)
+    return per_second(play) * len(moves)
+
+
+def main():
+    rows = []
+    for size in SIZES:
+        _, moves = random_position(size, fill=0)
+        # Stop before the last moves, a full board has a winner early anyway.
+        moves = moves[:size*size // 2]
+        cells = [divmod(index, size) for index in range(size*size)]
+        adjacent = topology(size).adjacent
+
+        def build_lists():
+            for cell in cells:
+                neighbours(cell, size)
+
+        def read_table():
+            for index in range(size*size):
+                adjacent[index]
+
+        rows.append([size,
+                     per_second(build_lists) * len(cells),
+                     per_second(read_table) * len(cells),
+                     steps_per_second(NeighbourListHexBase, size, moves),
+                     steps_per_second(HexBase, size, moves),
+                     steps_per_second(HexBitBoard, size, moves)])
+
+    print(tabulate(rows, floatfmt='.0f', tablefmt='orgtbl',
+                   headers=['size', 'neighbours()/s', 'topology lookups/s',
+                            'before step/s', 'HexBase step/s', 'HexBitBoard step/s']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""
+Training data export from a corpus: samples written per second and the
+memory the process holds, which should not grow with the number of games.
+
+    python -m benchmarks.bench_training_data [number of games]
+"""
+import sys
+import tempfile
+from time import perf_counter
+
+import numpy as np
+from db.corpus import CorpusReader, CorpusWriter
+from db.training_data import corpus_games, training_batches, write_shards
+from tabulate import tabulate
+
+from benchmarks.bench_corpus import BATCH, SIZE, max_rss_mb, random_games
+
+GAMES = 20_000
+
+
+def main():
+    num_games = int(sys.argv[1]) if len(sys.argv) > 1 else GAMES
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as directory:
+        writer = CorpusWriter(directory + '/corpus')
+        for first_id in range(0, num_games, BATCH):
+            writer.append(random_games(min(BATCH, num_games - first_id), first_id, rng))
+        rss_before = max_rss_mb()
+
+        start = perf_counter()
+        batches = training_batches(corpus_games(CorpusReader(directory + '/corpus')), SIZE)
+        samples = write_shards(batches, directory + '/out', SIZE)
+        seconds = perf_counter() - start
+
+    print(tabulate([[num_games, samples, samples / seconds, rss_before, max_rss_mb()]],
+                   floatfmt='.1f', tablefmt='orgtbl',
+                   headers=['games', 'samples', 'samples/s', 'max RSS MB before export',
+                            'max RSS MB after export']))
+
+
+if __name__ == '__main__':
+    main()
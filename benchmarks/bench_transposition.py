@@ -0,0 +1,47 @@
+"""
+Transposition table hit rates, the share of lookups that found visits
+made through another move order, and rollouts per second of MCTSAgent
+with and without the table.
+
+    python -m benchmarks.bench_transposition
+"""
+import random
+from time import perf_counter
+
+from agents.mcts import MCTSAgent
+from agents.transposition import TranspositionTable
+from hex.board import HexBase
+from tabulate import tabulate
+
+SIZES = (7, 9, 11)
+ROLLOUTS = 2000
+TT_ENTRIES = 1 << 16
+
+
+def run(size, transpositions=None):
+    random.seed(size)
+    agent = MCTSAgent(HexBase(size), transpositions)
+    start = perf_counter()
+    agent.search(ROLLOUTS)
+    return agent, ROLLOUTS / (perf_counter() - start)
+
+
+def main():
+    rows = []
+    for size in SIZES:
+        _, plain_rate = run(size)
+        table = TranspositionTable(TT_ENTRIES)
+        agent, table_rate = run(size, table)
+        # Positions visited through more than one tree node.
+        shared = agent.tree.num_nodes - len(set(agent.tree.hash[:agent.tree.num_nodes].tolist()))
+        rows.append([size, table.hit_rate, table.lookups, len(table),
+                     table.nbytes() / len(table), table.evictions, shared, plain_rate, table_rate])
+
+    print(tabulate(rows, floatfmt=('.0f', '.4f', '.0f', '.0f', '.0f', '.0f', '.0f', '.0f', '.0f'),
+                   tablefmt='orgtbl',
+                   headers=['size', 'hit rate', 'lookups', 'entries', 'bytes/entry', 'evictions',
+                            'transposed nodes', 'rollouts/s', 'rollouts/s with table']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Memory per node and rollouts per second of the array tree MCTSAgent
+against the object tree reference agent.
+
+    python -m benchmarks.bench_tree
+"""
+import tracemalloc
+from time import perf_counter
+
+from agents.mcts import MCTSAgent
+from hex.board import HexBase
+from tabulate import tabulate
+
+from benchmarks.reference import ObjectTreeMCTSAgent
+
+SIZES = (6, 8, 11)
+ROLLOUTS = 1000
+
+
+def count_nodes(node):
+    return 1 + sum(count_nodes(child) for child in node.children)
+
+
+def measure(agent_cls, size):
+    '''
+    Returns the agent, its rollouts per second and the bytes still allocated
+    after a second traced search, which are held by the agent and its tree.
+    '''
+    agent = agent_cls(HexBase(size))
+    start = perf_counter()
+    agent.search(ROLLOUTS)
+    elapsed = perf_counter() - start
+
+    state = HexBase(size)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    agent = agent_cls(state)
+    agent.search(ROLLOUTS)
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return agent, ROLLOUTS / elapsed, allocated
+
+
+def main():
+    rows = []
+    for size in SIZES:
+        object_agent, object_rate, object_bytes = measure(ObjectTreeMCTSAgent, size)
+        array_agent, array_rate, array_bytes = measure(MCTSAgent, size)
+        object_nodes = count_nodes(object_agent.root_node)
+        array_nodes = array_agent.tree.num_nodes
+        rows.append([size, object_nodes, object_bytes / object_nodes, array_bytes / array_nodes,
+                     array_agent.tree.node_bytes, object_rate, array_rate])
+
+    print(tabulate(rows, floatfmt='.0f', tablefmt='orgtbl',
+                   headers=['size', 'nodes', 'object B/node', 'array B/node (incl. spare)',
+                            'array B/node (arrays)', 'object rollouts/s', 'array rollouts/s']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Tree-parallel numba MCTS against sequential numba MCTS at equal wall time:
+rollouts per second, and the score of the tree-parallel agent in games
+between the two with the same time per move.
+
+    python -m benchmarks.bench_tree_parallel
+"""
+import os
+import sys
+
+from agents.mcts_numba import NumbaMCTSAgent, TreeParallelMCTSAgent, compile_kernels
+from hex.board import Hex, HexBase
+from tabulate import tabulate
+
+THREAD_COUNTS = (1, 2, 4, 8)
+TIME_BUDGET = 0.5
+SIZE = 9
+GAMES = 10
+GAME_TIME_BUDGET = 0.1
+
+
+def play(agents, size, time_budget):
+    '''
+    Plays a game where agents maps a player to an agent class, returns the winner.
+    '''
+    game = Hex(size)
+    while game.winner is None:
+        agent = agents[game.turn](game.get_base())
+        agent.search(time_budget=time_budget)
+        game.step(agent.best_move())
+    return game.winner
+
+
+def main(games=GAMES):
+    compile_kernels()
+    print(f'{os.cpu_count()} cpus, {SIZE}x{SIZE} board, {TIME_BUDGET}s per search')
+
+    sequential = NumbaMCTSAgent(HexBase(SIZE))
+    sequential.search(time_budget=TIME_BUDGET)
+    rows = [['sequential', sequential.num_rollouts / TIME_BUDGET, '']]
+
+    for threads in THREAD_COUNTS:
+        agent = TreeParallelMCTSAgent(HexBase(SIZE), threads=threads)
+        agent.search(time_budget=TIME_BUDGET)
+
+        def parallel_agent(state):
+            return TreeParallelMCTSAgent(state, threads=threads)
+
+        score = 0
+        for game in range(games):
+            parallel_player = 1 if game % 2 == 0 else -1
+            winner = play({parallel_player: parallel_agent, -parallel_player: NumbaMCTSAgent},
+                          SIZE, GAME_TIME_BUDGET)
+            score += winner == parallel_player
+        rows.append([f'{threads} threads', agent.num_rollouts / TIME_BUDGET, f'{score}/{games}'])
+
+    print(tabulate(rows, floatfmt='.0f', tablefmt='orgtbl',
+                   headers=['search', 'rollouts/s', 'wins vs sequential']))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,72 @@
+"""
+Cost per MCTS iteration of getting the selected position: deepcopy or
+copy() of the root state and replaying the path on the copy, against
+replaying it on the root state and undoing it afterwards.
+
+    python -m benchmarks.bench_undo
+"""
+import gc
+import tracemalloc
+from copy import deepcopy
+
+from tabulate import tabulate
+
+from benchmarks.common import per_second, random_position
+
+SIZES = (6, 8, 11, 13)
+DEPTH = 6
+
+
+def with_deepcopy(state, path):
+    curr_state = deepcopy(state)
+    for move in path:
+        curr_state.step(move)
+
+
+def with_copy(state, path):
+    curr_state = state.copy()
+    for move in path:
+        curr_state.step(move)
+
+
+def with_undo(state, path):
+    for move in path:
+        state.step(move)
+    for _ in path:
+        state.undo()
+
+
+def peak_allocation(func, *args):
+    '''
+    Bytes allocated at the peak of one call on top of what was allocated before.
+    '''
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak - before
+
+
+def main():
+    rows = []
+    for size in SIZES:
+        state, moves = random_position(size, fill=0.3)
+        state = state.copy(undoable=True)
+        path = moves[:DEPTH]
+        row = [size]
+        for func in (with_deepcopy, with_copy, with_undo):
+            gc.collect()
+            row.append(1e6 / per_second(lambda: func(state, path)))
+        for func in (with_deepcopy, with_copy, with_undo):
+            row.append(peak_allocation(func, state, path))
+        rows.append(row)
+
+    print(f'{DEPTH} moves selected per iteration')
+    print(tabulate(rows, floatfmt='.1f', tablefmt='orgtbl',
+                   headers=['size', 'deepcopy us', 'copy us', 'undo us',
+                            'deepcopy B', 'copy B', 'undo B']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Dict based UnionFind (tuple keys, recursive find, member lists) against
+the list based ArrayUnionFind that HexBase now uses: raw joins and finds
+of a random game, and random games per second with either in HexBase.
+
+    python -m benchmarks.bench_union_find
+"""
+from random import Random
+
+import numpy as np
+from hex.board import P1, P2, ArrayUnionFind, HexBase
+from tabulate import tabulate
+
+from benchmarks.common import per_second
+from benchmarks.reference import UnionFind
+
+SIZES = (6, 8, 11, 13, 15, 19)
+
+
+class NumpyUnionFind(ArrayUnionFind):
+    """
+    ArrayUnionFind over numpy int32 arrays, to show the cost of scalar
+    indexing into numpy from python.
+    """
+
+    def __init__(self, n=0) -> None:
+        self.parent = np.arange(n, dtype=np.int32)
+        self.rank = np.zeros(n, dtype=np.int32)
+        self.trail = None
+
+
+def game_operations(size, seed=0):
+    '''
+    Returns the joins made by the first player in a random game and the
+    ids it then checks, as flat indices.
+    '''
+    state = HexBase(size)
+    rng = Random(seed)
+    joins = []
+    while state.winner is None:
+        index = state.empty.cells[rng.randrange(len(state.empty))]
+        player = state.turn
+        state.step(divmod(index, size))
+        if player != P1:
+            continue
+        edge = state.topology.edge[P1][index]
+        if edge >= 0:
+            joins.append((edge, index))
+        flat = state.board.ravel()
+        joins.extend((neighbour, index) for neighbour in state.topology.adjacent[index]
+                     if flat[neighbour] == P1)
+    return joins, list(range(size*size + 2))
+
+
+def join_and_find(make_union_find, joins, ids):
+    union_find = make_union_find()
+    for x, y in joins:
+        union_find.join(x, y)
+    for x in ids:
+        union_find.find(x)
+
+
+def random_games(size, make_union_find, seed=0):
+    rng = Random(seed)
+
+    def game():
+        state = HexBase(size)
+        state.groups = {P1: make_union_find(), P2: make_union_find()}
+        while state.winner is None:
+            state.step(divmod(state.empty.cells[rng.randrange(len(state.empty))], size))
+    return per_second(game)
+
+
+def main():
+    rows = []
+    for size in SIZES:
+        joins, ids = game_operations(size)
+        n = size*size + 2
+        variants = (UnionFind, lambda: ArrayUnionFind(n), lambda: NumpyUnionFind(n))
+        row = [size, len(joins)]
+        row.extend(per_second(lambda: join_and_find(make, joins, ids)) for make in variants)
+        row.extend(random_games(size, make) for make in variants[:2])
+        rows.append(row)
+
+    print(tabulate(rows, floatfmt='.0f', tablefmt='orgtbl',
+                   headers=['size', 'joins', 'dict uf/s', 'list uf/s', 'numpy uf/s',
+                            'dict games/s', 'list games/s']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+from random import Random
+from time import perf_counter
+
+from hex.board import HexBase
+
+
+def per_second(func, min_time=0.2):
+    """
+    Calls func repeatedly for at least min_time seconds and returns
+    the number of calls per second.
+    """
+    calls = 0
+    start = perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        func()
+        calls += 1
+        elapsed = perf_counter() - start
+    return calls / elapsed
+
+
+def random_position(size, fill=0.5, seed=0, state_cls=HexBase):
+    """
+    Returns a state with roughly fill*size*size random stones and no winner,
+    together with the remaining empty cells in random order.
+    """
+    rng = Random(seed)
+    state = state_cls(size)
+    moves = state.legal_moves()
+    rng.shuffle(moves)
+    for _ in range(int(fill * size * size)):
+        state.step(moves.pop())
+        if state.winner is not None:
+            return random_position(size, fill, seed + 1, state_cls)
+    return state, moves
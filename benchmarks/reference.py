@@ -0,0 +1,454 @@
+"""
+Reference implementations kept for comparison in benchmarks: the object
+tree MCTS agent (one Node object per tree node) that agents.mcts used
+before its tree moved to arrays, the HexBase step that built the
+neighbour list of the cell on every move, the winner property that
+step now replaces, the dict based union-find and the shortest_connection
+BFS over a dict graph.
+"""
+from collections import defaultdict
+from math import log, sqrt
+from queue import Queue
+from random import choice
+
+import numpy as np
+
+from agents.mcts import EXPLORE, RAVE_CONST, ROLLOUT
+from hex.board import (EMPTY, NO_EDGE, P1, P2, HexBase, HexException, neighbours,
+                       opponent, topology, zobrist_keys)
+
+
+class UnionFind:
+    """
+    Dict based unionfind with member lists that HexBase used before
+    ArrayUnionFind, with the trail and rollback of undoable states.
+
+    Attributes:
+        parent (dict): Each group parent
+        rank (dict): Each group rank
+        groups (dict): Stores the groups and chain of cells
+        trail (list): Changes to revert with rollback, None when not recorded
+    """
+
+    def __init__(self) -> None:
+        self.parent = {}
+        self.rank = {}
+        self.groups = {}
+        self.trail = None
+
+    def join(self, x, y) -> bool:
+        """
+        Merge the groups of x and y if they were not already,
+        return False if they were already merged, true otherwise.
+
+        Args:
+            x (int): flat cell index or edge id
+            y (int): flat cell index or edge id
+
+        """
+        # Find root/parent node of x and y
+        root_x = self.find(x)
+        root_y = self.find(y)
+
+        # Return false if x and y are in the same group
+        if root_x == root_y:
+            return False
+
+        if self.trail is not None:
+            child, root = (root_y, root_x) if self.rank[root_x] > self.rank[root_y] else (root_x, root_y)
+            self.trail.append(('join', child, root, self.rank[root], len(self.groups[root])))
+
+        # Add the tree with the smaller rank to the one with the higher rank and delete the smaller tree.
+        if self.rank[root_x] < self.rank[root_y]:
+            self.parent[root_x] = root_y
+            self.groups[root_y].extend(self.groups[root_x])
+            del self.groups[root_x]
+
+        elif self.rank[root_x] > self.rank[root_y]:
+            self.parent[root_y] = root_x
+            self.groups[root_x].extend(self.groups[root_y])
+            del self.groups[root_y]
+
+        # If the trees have same rank, add one to the other and increase it's rank.
+        else:
+            self.parent[root_x] = root_y
+            self.rank[root_y] += 1
+            self.groups[root_y].extend(self.groups[root_x])
+            del self.groups[root_x]
+
+        return True
+
+    def find(self, x):
+        """
+        Get the root element of the group in which element x resides. 
+        Uses grandparent compression to compress the tree on each find 
+        operation so that future find operations are faster.
+        Args:
+            x (int): flat cell index or edge id
+        """
+        if x not in self.parent:
+            self.parent[x] = x
+            self.rank[x] = 0
+            self.groups[x] = [x]
+            if self.trail is not None:
+                self.trail.append(('add', x))
+
+        # If root node then return node itself.
+        parent_x = self.parent[x]
+        if x == parent_x:
+            return x
+
+        parent_parent_x = self.parent[parent_x]
+        if parent_parent_x == parent_x:
+            return parent_x
+
+        # Compress treee by bringing passed node above by making it's parent, it's parent's parent
+        if self.trail is not None:
+            self.trail.append(('parent', x, parent_x))
+        self.parent[x] = parent_parent_x
+
+        return self.find(parent_parent_x)
+
+    def connected(self, x, y) -> bool:
+        """
+        Check if two elements are conneced.
+
+        Args:
+            x (int): flat cell index or edge id
+            y (int): flat cell index or edge id
+        """
+        return self.find(x) == self.find(y)
+
+    def rollback(self, mark):
+        """
+        Reverts the changes recorded in the trail after its first mark entries.
+        """
+        trail = self.trail
+        while len(trail) > mark:
+            entry = trail.pop()
+            if entry[0] == 'parent':
+                self.parent[entry[1]] = entry[2]
+            elif entry[0] == 'join':
+                _, child, root, rank, length = entry
+                self.parent[child] = child
+                self.rank[root] = rank
+                self.groups[child] = self.groups[root][length:]
+                del self.groups[root][length:]
+            else:
+                x = entry[1]
+                del self.parent[x], self.rank[x], self.groups[x]
+
+    def copy(self):
+        new = UnionFind()
+        new.parent = self.parent.copy()
+        new.rank = self.rank.copy()
+        new.groups = {root: members.copy() for root, members in self.groups.items()}
+        return new
+
+
+class PropertyWinnerHexBase(HexBase):
+    """
+    HexBase checking the edge connections of both players every time winner
+    is read, as it did before step cached the winner.
+    """
+
+    def edges(self):
+        return self.topology.start, self.topology.finish
+
+    @property
+    def winner(self):
+        start, finish = self.edges()
+        if self.groups[P2].connected(start, finish):
+            return P2
+        elif self.groups[P1].connected(start, finish):
+            return P1
+        else:
+            return None
+
+    @winner.setter
+    def winner(self, value):
+        # HexBase.__init__ assigns the cached winner, there is none here.
+        pass
+
+    def step(self, cell):
+        player = self.turn
+        if self.board[cell] == EMPTY:
+            self.board[cell] = player
+        else:
+            raise HexException(f"Cell {cell} already occupied.")
+        index = cell[0]*self.size + cell[1]
+        self.empty.remove(index)
+        self.hash ^= int(zobrist_keys(self.size)[0 if player == P1 else 1, index])
+
+        topo = self.topology
+        groups = self.groups[player]
+        edge = topo.edge[player][index]
+        if edge != NO_EDGE:
+            groups.join(edge, index)
+
+        flat = self.board.ravel()
+        for neighbour in topo.adjacent[index]:
+            if flat[neighbour] == player:
+                groups.join(neighbour, index)
+
+        self.turn = opponent(player)
+
+
+class NeighbourListHexBase(PropertyWinnerHexBase):
+    """
+    HexBase stepping with neighbours() and (row, column) keys in the
+    union-find, as it did before board code shared a Topology.
+    """
+
+    def __init__(self, size):
+        super().__init__(size)
+        self.groups = {P1: UnionFind(), P2: UnionFind()}
+
+    def edges(self):
+        return 's', 'f'
+
+    def step(self, cell):
+        player = self.turn
+        if self.board[cell] == EMPTY:
+            self.board[cell] = player
+        else:
+            raise HexException(f"Cell {cell} already occupied.")
+        self.empty.remove(cell[0]*self.size + cell[1])
+        self.hash ^= int(zobrist_keys(self.size)[0 if player == P1 else 1,
+                                                 cell[0]*self.size + cell[1]])
+
+        coord_index = 0 if player == P1 else 1
+        if cell[coord_index] == 0:
+            self.groups[player].join('s', cell)
+        elif cell[coord_index] == self.size - 1:
+            self.groups[player].join('f', cell)
+
+        for neighbour in neighbours(cell, self.size):
+            if self.board[neighbour] == player:
+                self.groups[player].join(neighbour, cell)
+
+        self.turn = opponent(player)
+
+
+class Node:
+    def __init__(self, move: tuple = None, parent=None):
+        self.parent = parent
+        self.move = move
+        self.children = []
+
+        self.N = 0
+        self.Q = 0
+        self.N_rave = 0
+        self.Q_rave = 0
+
+    def get_value(self):
+        return self.N
+
+    @property
+    def value(self, explore=EXPLORE):
+        if self.N == 0:
+            return 0 if explore == 0 else float('inf')
+        else:
+            rave_weight = max(0, 1 - (self.N_rave/RAVE_CONST))
+            UCT_value = self.Q/self.N + explore * \
+                sqrt(2 * log(self.parent.N/self.N))
+            rave_value = self.Q_rave/self.N_rave if self.N_rave != 0 else 0
+
+            value = (1 - rave_weight)*UCT_value + rave_weight*rave_value
+            return value
+
+    def add_children(self, new_children: dict):
+        self.children.extend(new_children)
+
+    @property
+    def isleaf(self):
+        return True if len(self.children) == 0 else False
+
+
+class ObjectTreeMCTSAgent:
+    def __init__(self, root_state: HexBase) -> None:
+        self.root_node = Node()
+        self.root_state = root_state.copy()
+        self.num_rollouts = 0
+
+    def simulate(self, state: HexBase):
+        curr_state = state.copy()
+        legal_moves = curr_state.legal_moves()
+
+        while curr_state.winner is None:
+            curr_action = choice(legal_moves)
+            curr_state.step(curr_action)
+            legal_moves.remove(curr_action)
+
+        black_rave_pts = state.player_cells(P1)
+        white_rave_pts = state.player_cells(P2)
+
+        return curr_state.winner, black_rave_pts, white_rave_pts
+
+    def expand(self, node: Node, state):
+        if state.winner is not None:
+            return False
+
+        node.add_children([Node(move, node)
+                          for move in state.legal_moves()])
+        return True
+
+    def select_node(self):
+        node = self.root_node
+        state = self.root_state.copy()
+
+        while not node.isleaf:
+            benchmark = float('-inf')
+            max_children = []
+            for child_node in node.children:
+                curr_value = child_node.value
+                if curr_value > benchmark:
+                    benchmark = curr_value
+                    max_children = []
+                    max_children.append(child_node)
+                elif curr_value == benchmark:
+                    max_children.append(child_node)
+
+            node = choice(max_children)
+            state.step(node.move)
+
+            if node.N == 0:
+                return node, state
+
+        if self.expand(node, state):
+            node = choice(node.children)
+            state.step(node.move)
+        return node, state
+
+    def backpropagate(self, node, outcome, turn, black_rave_pts, white_rave_pts):
+        reward = -1 if outcome == turn else 1
+
+        while node is not None:
+            for i, child_node in enumerate(node.children):
+                if turn == P2:
+                    if child_node.move in white_rave_pts:
+                        node.children[i].Q_rave += -reward
+                        node.children[i].N_rave += 1
+                else:
+                    if child_node.move in black_rave_pts:
+                        node.children[i].Q_rave += -reward
+                        node.children[i].N_rave += 1
+
+            node.N += 1
+            node.Q += reward
+
+            turn = -turn
+            reward = -reward
+
+            node = node.parent
+
+    def search(self, num_rollout=ROLLOUT):
+        num_rollouts = 0
+        while num_rollouts < num_rollout:
+            node, state = self.select_node()
+            turn = state.turn
+            outcome, black, white = self.simulate(state)
+            self.backpropagate(node, outcome, turn, black, white)
+            num_rollouts += 1
+        self.num_rollouts = num_rollouts
+
+    def best_move(self) -> tuple:
+        benchmark = float('-inf')
+        max_children = []
+        for child_node in self.root_node.children:
+            curr_value = child_node.get_value()
+            if curr_value > benchmark:
+                benchmark = curr_value
+                max_children = []
+                max_children.append(child_node)
+            elif curr_value == benchmark:
+                max_children.append(child_node)
+
+        return choice(max_children).move
+
+
+def reference_rave_deltas(tree, node, outcome, turn, owner, root_turn):
+    '''
+    Straightforward AMAF reference for agents.mcts.Tree: for every node on
+    the path from node to the root, each child whose move the player to move
+    at that node played later in the simulation (deeper tree moves or
+    playout) gets one RAVE visit worth the reward of that player.
+    Returns {child: (N_rave delta, Q_rave delta)}.
+    '''
+    path = []
+    while node != -1:
+        path.append(node)
+        node = tree.parent[node]
+    path.reverse()
+
+    # Moves as (cell, player) of the tree path, path[k] is played at depth k - 1.
+    tree_moves = [(int(tree.move[path[depth]]), root_turn if depth % 2 == 1 else -root_turn)
+                  for depth in range(1, len(path))]
+    playout_moves = {(cell, int(player)) for cell, player in enumerate(owner) if player != 0}
+
+    deltas = {}
+    reward = -1 if outcome == turn else 1
+    for depth in range(len(path) - 1, -1, -1):
+        player = root_turn if depth % 2 == 0 else -root_turn
+        played_after = set(tree_moves[depth:]) | playout_moves
+        first = tree.first_child[path[depth]]
+        for child in range(first, first + tree.num_children[path[depth]]):
+            if (int(tree.move[child]), player) in played_after:
+                deltas[child] = (1, -reward)
+        reward = -reward
+    return deltas
+
+
+def queue_shortest_connection(board, size, player):
+    """
+    shortest_connection as it was, a BFS with queue.Queue over a graph
+    of dict adjacency lists built on every call.
+    """
+    topo = topology(size)
+    EDGE_START = topo.start
+    EDGE_FINISH = topo.finish
+    flat = np.asarray(board).ravel()
+    edge = topo.edge[player]
+
+    # Generating graph upon which BFS is applied
+    graph_dict = defaultdict(list)
+    for index in np.flatnonzero(flat == player).tolist():
+        for neighbour in topo.adjacent[index]:
+            if flat[neighbour] == player:
+                graph_dict[index].append(neighbour)
+
+        if edge[index] != NO_EDGE:
+            graph_dict[edge[index]].append(index)
+            graph_dict[index].append(edge[index])
+
+    # BFS algorithm to find the cost of each node.
+    cost_dict = {}
+    cost_dict[EDGE_START] = 0
+    queue = Queue()
+    queue.put(EDGE_START)
+    while not(queue.empty()):
+        node = queue.get()
+        node_cost = cost_dict[node]
+        for neighbour in graph_dict[node]:
+            if cost_dict.get(neighbour, None) == None:
+                cost_dict[neighbour] = node_cost + 1
+                if neighbour == EDGE_FINISH:
+                    break
+                queue.put(neighbour)
+
+    # Iterating backword to get the shortest path.
+    shortest_path = []
+    node = EDGE_FINISH
+    while node != EDGE_START:
+        next_node = None
+        next_node_value = float('inf')
+        for neighbour in graph_dict[node]:
+            neighbour_value = cost_dict.get(neighbour, float('inf'))
+            if neighbour_value < next_node_value:
+                next_node_value = neighbour_value
+                next_node = neighbour
+        node = next_node
+        shortest_path.append(node)
+    shortest_path.remove(EDGE_START)
+
+    return [divmod(index, size) for index in shortest_path]
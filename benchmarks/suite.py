@@ -0,0 +1,265 @@
+"""
+Benchmark suite of the board, the MCTS agent, game storage and the GUI,
+with fixed seeds, JSON results and comparison against a stored baseline.
+
+    python -m benchmarks.suite                          # run and print
+    python -m benchmarks.suite -o results.json          # also write the results
+    python -m benchmarks.suite --baseline benchmarks/baseline.json
+    python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --only board --sizes 6 11 --quick
+
+With --baseline the exit status is 1 if any result is worse than the
+baseline by more than --tolerance. Baselines are only comparable on the
+machine (and in the --quick mode) they were recorded with.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+from typing import NamedTuple
+
+import numpy as np
+from tabulate import tabulate
+
+from benchmarks.common import per_second, random_position
+
+SEED = 0
+SIZES = (6, 8, 11, 13)
+GAME_COUNTS = (10, 100, 1000)
+DEFAULT_BASELINE = Path(__file__).parent / 'baseline.json'
+# Every rate is the best of this many measurements.
+ROUNDS = 3
+
+
+class Result(NamedTuple):
+    name: str
+    value: float
+    unit: str
+    higher_is_better: bool
+
+
+def seed_all(seed=SEED):
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+def best_seconds(func, repeat):
+    """
+    Returns the shortest wall time of repeat calls of func. The minimum is
+    the least affected by other load on the machine.
+    """
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+def best_rate(func, min_time, rounds=ROUNDS):
+    """
+    Returns the highest calls per second of func over rounds measurements.
+    """
+    return max(per_second(func, min_time) for _ in range(rounds))
+
+
+def finished_game(size, seed=SEED):
+    """
+    Returns a Hex at the end of a random game played with seed.
+    """
+    from hex.board import Hex
+
+    rng = random.Random(seed)
+    state = Hex(size)
+    while state.winner is None:
+        moves = state.legal_indices()
+        state.step(divmod(moves[rng.randrange(len(moves))], size))
+    return state
+
+
+def bench_board(sizes, quick):
+    from hex.board import HexBase, possible_moves, shortest_connection
+
+    min_time = 0.05 if quick else 0.2
+    for size in sizes:
+        seed_all()
+        state, moves = random_position(size, fill=0.3)
+
+        def play():
+            curr_state = state.copy()
+            for move in moves[:size]:
+                curr_state.step(move)
+
+        yield Result(f'board/step/{size}', best_rate(play, min_time) * size, 'steps/s', True)
+        yield Result(f'board/winner/{size}', best_rate(lambda: state.winner, min_time),
+                     'reads/s', True)
+        yield Result(f'board/possible_moves/{size}',
+                     best_rate(lambda: possible_moves(size, state.board), min_time), 'calls/s', True)
+        yield Result(f'board/legal_moves/{size}', best_rate(state.legal_moves, min_time),
+                     'calls/s', True)
+
+        game = finished_game(size)
+        yield Result(f'board/shortest_connection/{size}',
+                     best_rate(lambda: shortest_connection(game.board, size, game.winner), min_time),
+                     'calls/s', True)
+
+        def random_game():
+            curr_state = HexBase(size)
+            while curr_state.winner is None:
+                curr_state.step(curr_state.random_move())
+
+        yield Result(f'board/random_game/{size}', best_rate(random_game, min_time), 'games/s', True)
+
+
+def bench_mcts(sizes, quick):
+    from agents.mcts import MCTSAgent
+    from hex.board import HexBase
+
+    num_rollout = 50 if quick else 300
+    for size in sizes:
+        def search():
+            seed_all()
+            agent = MCTSAgent(HexBase(size))
+            agent.rng = np.random.default_rng(SEED)
+            agent.search(num_rollout)
+            return agent.best_move()
+
+        # The first search of a size also fills the per-size caches.
+        search()
+        seconds = best_seconds(search, 3 if quick else 5)
+        yield Result(f'mcts/rollouts/{size}', num_rollout / seconds, 'rollouts/s', True)
+        yield Result(f'mcts/move_latency/{size}', seconds, f's/move ({num_rollout} rollouts)', False)
+
+
+def bench_storage(counts, quick):
+    from db.game_storage_api import TABLE_NAME, GameSaver, GameStorageAPI
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = str(Path(directory) / 'games.db')
+        datafile_path = str(Path(directory) / 'games.dat')
+        saver = GameSaver(db_path, TABLE_NAME, datafile_path, pickle_datafile_path=None)
+        storage = GameStorageAPI(db_path, TABLE_NAME, datafile_path, pickle_datafile_path=None)
+
+        histories = [finished_game(6, seed).move_history for seed in range(20)]
+        if quick:
+            counts = sorted({min(count, 100) for count in counts})
+        saved = 0
+        last_id = None
+        for count in counts:
+            start = perf_counter()
+            new = count - saved
+            for number in range(new):
+                last_id = saver.save('player_1', 'player_2', 'player_1', False,
+                                     histories[number % len(histories)], 6)
+            if new > 0:
+                yield Result(f'storage/save/{count}', new / (perf_counter() - start), 'games/s', True)
+            saved = max(saved, count)
+
+            seconds = 1 / best_rate(lambda: storage.search_datafile(last_id),
+                                    0.05 if quick else 0.2)
+            yield Result(f'storage/search_datafile/{count}', seconds, 's/search (last game)', False)
+        saver.db.db.close()
+        storage.db.db.close()
+
+
+def bench_gui(sizes, quick):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from hex.gui.draw_board import HexPlot
+
+    for size in sizes:
+        def plot():
+            fig, _, _ = HexPlot(size)
+            plt.close(fig)
+
+        yield Result(f'gui/HexPlot/{size}', best_seconds(plot, 3), 's', False)
+
+
+GROUPS = {
+    'board': lambda args: bench_board(args.sizes, args.quick),
+    'mcts': lambda args: bench_mcts(args.sizes, args.quick),
+    'storage': lambda args: bench_storage(args.game_counts, args.quick),
+    'gui': lambda args: bench_gui(args.sizes, args.quick),
+}
+
+
+def compare(results, baseline, tolerance):
+    """
+    Returns table rows of the results next to the baseline and the names of
+    the results worse than the baseline by more than tolerance.
+    """
+    rows = []
+    regressions = []
+    for result in results:
+        reference = baseline.get(result.name)
+        if reference is None:
+            rows.append([result.name, result.value, result.unit, None, None, ''])
+            continue
+        reference = reference['value']
+        ratio = result.value / reference if result.higher_is_better else reference / result.value
+        flag = ''
+        if ratio < 1 - tolerance:
+            flag = 'REGRESSION'
+            regressions.append(result.name)
+        elif ratio > 1 + tolerance:
+            flag = 'improved'
+        rows.append([result.name, result.value, result.unit, reference, 100 * (ratio - 1), flag])
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the Hex benchmark suite.')
+    parser.add_argument('--only', nargs='*', choices=sorted(GROUPS), default=sorted(GROUPS),
+                        help='benchmark groups to run')
+    parser.add_argument('--sizes', nargs='*', type=int, default=list(SIZES))
+    parser.add_argument('--game-counts', nargs='*', type=int, default=list(GAME_COUNTS))
+    parser.add_argument('--quick', action='store_true', help='fewer repeats and rollouts')
+    parser.add_argument('-o', '--output', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', nargs='?', const=str(DEFAULT_BASELINE),
+                        help=f'compare against a results file (default {DEFAULT_BASELINE.name})')
+    parser.add_argument('--save-baseline', nargs='?', const=str(DEFAULT_BASELINE),
+                        help='write the results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help='relative slowdown reported as a regression')
+    args = parser.parse_args(argv)
+
+    results = []
+    for group in args.only:
+        for result in GROUPS[group](args):
+            print(f'{result.name}: {result.value:.6g} {result.unit}', file=sys.stderr)
+            results.append(result)
+
+    report = {
+        'meta': {'seed': SEED, 'quick': args.quick, 'python': platform.python_version(),
+                 'numpy': np.__version__, 'machine': platform.machine(),
+                 'platform': platform.platform()},
+        'results': {result.name: {'value': result.value, 'unit': result.unit,
+                                  'higher_is_better': result.higher_is_better}
+                    for result in results},
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            Path(path).write_text(json.dumps(report, indent=2) + '\n')
+
+    baseline = {}
+    if args.baseline:
+        stored = json.loads(Path(args.baseline).read_text())
+        if stored['meta'].get('quick') != args.quick:
+            print('Warning: baseline was recorded with a different --quick setting.', file=sys.stderr)
+        baseline = stored['results']
+    rows, regressions = compare(results, baseline, args.tolerance)
+    print(tabulate(rows, floatfmt='.4g', tablefmt='orgtbl',
+                   headers=['benchmark', 'value', 'unit', 'baseline', 'change %', '']))
+    if regressions:
+        print(f'{len(regressions)} regression(s): {", ".join(regressions)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
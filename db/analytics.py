@@ -0,0 +1,302 @@
+"""
+Aggregate statistics over all stored games, computed in parallel.
+
+For every board size it reports the first player's win rate by opening
+cell, the distribution of game lengths, how agents fare against humans and
+the mean length of the winning path found by shortest_connection. Worker
+processes replay chunks of games and return partial counts, which add up.
+
+The counts are cached in a JSON file together with the last game read, so
+a re-run only replays the games stored since: newer game ids in the game
+database, or games appended after the last position in a corpus.
+
+    python -m db.analytics [--workers 4] [--cache db/analytics.json]
+    python -m db.analytics --corpus db/corpus [--json report.json]
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from hex.board import P1, P2, HexBase, shortest_connection
+from tabulate import tabulate
+
+from db.corpus import CorpusReader
+from db.db_api import game_db_api
+from db.record_store import RecordStore
+
+CACHE_VERSION = 1
+CACHE_PATH = 'db/analytics.json'
+CHUNK = 2000
+
+
+def empty_stats(size):
+    '''
+    Counts of one board size. Lists are indexed by flat cell index or by
+    game length.
+    '''
+    n = size*size
+    return {
+        'games': 0,
+        'unfinished': 0,
+        'first_player_wins': 0,
+        'opening_games': [0]*n,
+        'opening_first_wins': [0]*n,
+        'lengths': [0]*(n + 1),
+        'agent_games': 0,
+        'agent_wins': 0,
+        'agent_first_games': 0,
+        'agent_first_wins': 0,
+        'path_games': 0,
+        'path_cells': 0,
+    }
+
+
+def merge_stats(total, part):
+    '''
+    Adds the counts of part, keyed by board size, into total.
+    '''
+    for size, stats in part.items():
+        into = total.setdefault(size, empty_stats(int(size)))
+        for key, value in stats.items():
+            if isinstance(value, list):
+                into[key] = [a + b for a, b in zip(into[key], value)]
+            else:
+                into[key] += value
+    return total
+
+
+def analyze_games(games):
+    '''
+    Replays (board_size, moves, agent_seat) games and returns their counts
+    keyed by board size. moves are flat cell indices, agent_seat is the
+    player the agent played against a human, else None. Runs in the
+    worker processes.
+    '''
+    result = {}
+    for size, moves, agent_seat in games:
+        stats = result.setdefault(str(size), empty_stats(size))
+        state = HexBase(size)
+        for index in moves:
+            if state.winner is not None:
+                break
+            state.step(divmod(index, size))
+        if state.winner is None or not moves:
+            stats['unfinished'] += 1
+            continue
+        first_wins = state.winner == P1
+        stats['games'] += 1
+        stats['first_player_wins'] += first_wins
+        stats['opening_games'][moves[0]] += 1
+        stats['opening_first_wins'][moves[0]] += first_wins
+        stats['lengths'][min(len(moves), size*size)] += 1
+        if agent_seat is not None:
+            stats['agent_games'] += 1
+            stats['agent_wins'] += state.winner == agent_seat
+            if agent_seat == P1:
+                stats['agent_first_games'] += 1
+                stats['agent_first_wins'] += first_wins
+        stats['path_games'] += 1
+        stats['path_cells'] += len(shortest_connection(state.board, size, state.winner))
+    return result
+
+
+def agent_seat(player_1, player_2, is_agent_play):
+    '''
+    Seat of the agent in a game against a human. Agents are stored without
+    a name by main.py, games between two named agents do not count.
+    '''
+    if not is_agent_play or (player_1 is None) == (player_2 is None):
+        return None
+    return P1 if player_1 is None else P2
+
+
+def store_chunks(db: game_db_api, records: RecordStore, after_id, chunk=CHUNK):
+    '''
+    Yields (last game id, games) chunks of the games stored after after_id.
+    '''
+    games = []
+    last_id = after_id
+    for game_id, player_1, player_2, _, is_agent_play, _ in db.iter_games(after_id):
+        last_id = game_id
+        game = records.get(game_id)
+        if game is not None:
+            size, history = game
+            games.append((size, [i*size + j for i, j in history],
+                          agent_seat(player_1, player_2, is_agent_play)))
+        if len(games) == chunk:
+            yield last_id, games
+            games = []
+    if games or last_id != after_id:
+        yield last_id, games
+
+
+def corpus_chunks(corpus: CorpusReader, after, chunk=CHUNK):
+    '''
+    Yields (number of games read, games) chunks of the corpus games from
+    position after on.
+    '''
+    for start in range(after, len(corpus), chunk):
+        stop = min(start + chunk, len(corpus))
+        meta = corpus.meta[start:stop]
+        games = []
+        for k, record in enumerate(meta):
+            player_1 = record['player_1'].decode() or None
+            player_2 = record['player_2'].decode() or None
+            games.append((int(record['board_size']), corpus.game_moves(start + k).tolist(),
+                          agent_seat(player_1, player_2, bool(record['is_agent_play']))))
+        yield stop, games
+
+
+def load_cache(path, source):
+    '''
+    Returns the cursor and the counts cached for source, or a fresh start.
+    '''
+    if path is not None and Path(path).exists():
+        with open(path) as file:
+            cache = json.load(file)
+        if cache.get('version') == CACHE_VERSION and cache.get('source') == source:
+            return cache['cursor'], cache['stats']
+    return 0, {}
+
+
+def save_cache(path, source, cursor, stats):
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w') as file:
+        json.dump({'version': CACHE_VERSION, 'source': source, 'cursor': cursor, 'stats': stats}, file)
+    os.replace(temporary, path)
+
+
+def run(chunks, stats, workers=1):
+    '''
+    Analyzes (cursor, games) chunks in worker processes, keeping at most two
+    chunks a worker in flight, and merges the counts into stats. Returns
+    the cursor after the last chunk, None if there was none.
+    '''
+    cursor = None
+    if workers <= 1:
+        for cursor, games in chunks:
+            merge_stats(stats, analyze_games(games))
+        return cursor
+
+    with ProcessPoolExecutor(workers) as executor:
+        pending = []
+        for chunk_cursor, games in chunks:
+            pending.append((chunk_cursor, executor.submit(analyze_games, games)))
+            if len(pending) >= 2*workers:
+                cursor, future = pending.pop(0)
+                merge_stats(stats, future.result())
+        for cursor, future in pending:
+            merge_stats(stats, future.result())
+    return cursor
+
+
+def report(stats):
+    '''
+    Turns the counts into rates and length statistics, keyed by board size.
+    '''
+    sizes = {}
+    for size, counts in sorted(stats.items(), key=lambda item: int(item[0])):
+        size_int = int(size)
+        games = counts['games']
+        opening_games = np.array(counts['opening_games'])
+        opening_wins = np.array(counts['opening_first_wins'])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            opening_rate = np.where(opening_games > 0, opening_wins / opening_games, np.nan)
+        lengths = np.array(counts['lengths'])
+        cumulative = np.cumsum(lengths)
+
+        def length_quantile(q):
+            return int(np.searchsorted(cumulative, q * games)) if games else None
+
+        sizes[size] = {
+            'games': games,
+            'unfinished': counts['unfinished'],
+            'first_player_win_rate': counts['first_player_wins'] / games if games else None,
+            'opening_win_rate': [[None if np.isnan(rate) else float(rate) for rate in row]
+                                 for row in opening_rate.reshape(size_int, size_int)],
+            'opening_games': opening_games.reshape(size_int, size_int).tolist(),
+            'length_mean': float(lengths @ np.arange(len(lengths)) / games) if games else None,
+            'length_median': length_quantile(0.5),
+            'length_p90': length_quantile(0.9),
+            'length_histogram': {length: count for length, count in enumerate(counts['lengths']) if count},
+            'agent_vs_human': {
+                'games': counts['agent_games'],
+                'agent_wins': counts['agent_wins'],
+                'agent_win_rate': counts['agent_wins'] / counts['agent_games'] if counts['agent_games'] else None,
+                'agent_first_games': counts['agent_first_games'],
+                'agent_first_wins': counts['agent_first_wins'],
+            },
+            'winning_path_mean': counts['path_cells'] / counts['path_games'] if counts['path_games'] else None,
+        }
+    return sizes
+
+
+def print_report(sizes):
+    def fmt(value, spec='.3f'):
+        return '-' if value is None else format(value, spec)
+
+    for size, summary in sizes.items():
+        agent = summary['agent_vs_human']
+        print(f'\n{size}x{size}: {summary["games"]} games, {summary["unfinished"]} unfinished')
+        print(tabulate([['first player win rate', fmt(summary['first_player_win_rate'])],
+                        ['length mean / median / p90',
+                         f'{fmt(summary["length_mean"], ".1f")} / {fmt(summary["length_median"], "d")} '
+                         f'/ {fmt(summary["length_p90"], "d")}'],
+                        ['agent vs human', f'{agent["agent_wins"]}/{agent["games"]} agent wins '
+                                           f'({fmt(agent["agent_win_rate"])}), '
+                                           f'{agent["agent_first_wins"]}/{agent["agent_first_games"]} '
+                                           'moving first'],
+                        ['winning path mean cells', fmt(summary['winning_path_mean'], '.2f')]],
+                       tablefmt='orgtbl'))
+        print('\nFirst player win rate by opening cell:')
+        print(tabulate([[row_number, *(fmt(rate, '.2f') for rate in row)]
+                        for row_number, row in enumerate(summary['opening_win_rate'])],
+                       headers=['', *range(int(size))], tablefmt='orgtbl', disable_numparse=True))
+
+
+def main(argv=None):
+    from db.game_storage_api import DATAFILE_PATH, DB_PATH, TABLE_NAME
+
+    parser = argparse.ArgumentParser(description='Aggregate statistics over the stored games.')
+    parser.add_argument('--corpus', help='analyze this corpus instead of the game database')
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--records', default=DATAFILE_PATH)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--cache', help=f'cache file, by default {CACHE_PATH} or analytics.json '
+                                        'in the corpus directory')
+    parser.add_argument('--rebuild', action='store_true', help='ignore the cache and replay all games')
+    parser.add_argument('--json', help='write the report to this file')
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        source = f'corpus:{Path(args.corpus).resolve()}'
+        cache_path = args.cache or str(Path(args.corpus) / 'analytics.json')
+    else:
+        source = f'db:{Path(args.db).resolve()}'
+        cache_path = args.cache or CACHE_PATH
+    cursor, stats = (0, {}) if args.rebuild else load_cache(cache_path, source)
+
+    if args.corpus:
+        chunks = corpus_chunks(CorpusReader(args.corpus), cursor)
+    else:
+        db = game_db_api(args.db, TABLE_NAME)
+        chunks = store_chunks(db, RecordStore(db.db, args.records), cursor)
+    new_cursor = run(chunks, stats, args.workers)
+    if new_cursor is not None:
+        save_cache(cache_path, source, new_cursor, stats)
+        print(f'Read games up to {"position" if args.corpus else "game id"} {new_cursor}.')
+    else:
+        print('No new games since the last run.')
+
+    sizes = report(stats)
+    print_report(sizes)
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(sizes, file, indent=1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Append only columnar corpus of games for bulk self-play data.
+
+A corpus is a directory of flat little endian column files:
+
+    header       magic, version, number of games, number of moves
+    moves.u16    moves of all games one after another, as flat cell indices (i*size + j)
+    offsets.u64  number of games + 1 offsets into moves, game k is moves[offsets[k]:offsets[k+1]]
+    meta.bin     one META_DTYPE record per game
+
+Appends write the columns first and the header last, so readers only ever
+see complete games. CorpusReader maps the columns with numpy.memmap: any
+game's moves are a slice of the mapped file and nothing is read into
+memory until it is used.
+"""
+import os
+import struct
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b'HEXCORP1'
+VERSION = 1
+HEADER = struct.Struct('<8sIQQ')
+MOVE_DTYPE = np.dtype('<u2')
+OFFSET_DTYPE = np.dtype('<u8')
+META_DTYPE = np.dtype([('game_id', '<i8'), ('board_size', 'u1'), ('winner', 'i1'),
+                       ('is_agent_play', 'u1'), ('player_1', 'S32'), ('player_2', 'S32'),
+                       ('timestamp', '<f8')])
+CHUNK = 1 << 16
+
+
+class CorpusError(Exception):
+    pass
+
+
+def read_header(path):
+    magic, version, num_games, num_moves = HEADER.unpack((Path(path) / 'header').read_bytes())
+    if magic != MAGIC or version != VERSION:
+        raise CorpusError(f'{path} is not a version {VERSION} game corpus')
+    return num_games, num_moves
+
+
+class CorpusWriter:
+    '''
+    Appends games to a corpus directory, creating it if needed.
+    '''
+
+    def __init__(self, path) -> None:
+        self.path = Path(path)
+        if not (self.path / 'header').exists():
+            self.path.mkdir(parents=True, exist_ok=True)
+            (self.path / 'moves.u16').write_bytes(b'')
+            (self.path / 'offsets.u64').write_bytes(np.zeros(1, OFFSET_DTYPE).tobytes())
+            (self.path / 'meta.bin').write_bytes(b'')
+            self.write_header(0, 0)
+        self.num_games, self.num_moves = read_header(self.path)
+        self.truncate()
+
+    def write_header(self, num_games, num_moves):
+        '''
+        Replaces the header in one step, so a reader sees the old or the new one.
+        '''
+        temporary = self.path / 'header.tmp'
+        temporary.write_bytes(HEADER.pack(MAGIC, VERSION, num_games, num_moves))
+        os.replace(temporary, self.path / 'header')
+
+    def truncate(self):
+        '''
+        Drops the column bytes of an append interrupted before its header.
+        '''
+        for name, size in (('moves.u16', self.num_moves * MOVE_DTYPE.itemsize),
+                           ('offsets.u64', (self.num_games + 1) * OFFSET_DTYPE.itemsize),
+                           ('meta.bin', self.num_games * META_DTYPE.itemsize)):
+            with open(self.path / name, 'r+b') as column:
+                column.truncate(size)
+
+    def append(self, games):
+        '''
+        Appends (game_id, history, board_size, winner, player_1, player_2,
+        is_agent_play) tuples. winner is P1 or P2.
+        '''
+        if not games:
+            return
+        timestamp = datetime.now().timestamp()
+        meta = np.zeros(len(games), META_DTYPE)
+        moves = []
+        lengths = np.zeros(len(games), np.int64)
+        for k, game in enumerate(games):
+            game_id, history, board_size, winner, player_1, player_2, is_agent_play = game
+            moves.extend(i*board_size + j for i, j in history)
+            lengths[k] = len(history)
+            meta[k] = (game_id, board_size, winner, is_agent_play,
+                       (player_1 or '').encode()[:32], (player_2 or '').encode()[:32], timestamp)
+        offsets = self.num_moves + np.cumsum(lengths)
+
+        with open(self.path / 'moves.u16', 'ab') as column:
+            column.write(np.array(moves, MOVE_DTYPE).tobytes())
+        with open(self.path / 'offsets.u64', 'ab') as column:
+            column.write(offsets.astype(OFFSET_DTYPE).tobytes())
+        with open(self.path / 'meta.bin', 'ab') as column:
+            column.write(meta.tobytes())
+
+        self.num_games += len(games)
+        self.num_moves = int(offsets[-1])
+        self.write_header(self.num_games, self.num_moves)
+
+
+def memmap(path, dtype, length):
+    if length == 0:
+        return np.zeros(0, dtype)
+    return np.memmap(path, dtype=dtype, mode='r', shape=(length,))
+
+
+class CorpusReader:
+    '''
+    Read only view of a corpus through memory maps, as of when it was opened.
+
+    Attributes:
+        moves (np.ndarray): flat uint16 moves of all games
+        offsets (np.ndarray): start of every game in moves, plus the end
+        meta (np.ndarray): META_DTYPE record of every game
+    '''
+
+    def __init__(self, path) -> None:
+        self.path = Path(path)
+        self.num_games, self.num_moves = read_header(self.path)
+        self.moves = memmap(self.path / 'moves.u16', MOVE_DTYPE, self.num_moves)
+        self.offsets = memmap(self.path / 'offsets.u64', OFFSET_DTYPE, self.num_games + 1)
+        self.meta = memmap(self.path / 'meta.bin', META_DTYPE, self.num_games)
+        self._order = None
+        self._sorted_ids = None
+
+    def __len__(self):
+        return self.num_games
+
+    def game_moves(self, index):
+        '''
+        Moves of the game at position index as a view into the mapped file.
+        '''
+        return self.moves[self.offsets[index]:self.offsets[index + 1]]
+
+    def find(self, game_id):
+        '''
+        Position of a game id in the corpus, None if it is not there.
+        '''
+        if self._sorted_ids is None:
+            # A contiguous copy of the ids (8 bytes a game), searchsorted
+            # would copy the strided meta column on every call.
+            ids = np.ascontiguousarray(self.meta['game_id'])
+            if np.all(ids[1:] >= ids[:-1]):
+                self._sorted_ids = ids
+            else:
+                self._order = np.argsort(ids, kind='stable')
+                self._sorted_ids = ids[self._order]
+        position = int(np.searchsorted(self._sorted_ids, game_id))
+        if position == len(self._sorted_ids) or self._sorted_ids[position] != game_id:
+            return None
+        return position if self._order is None else int(self._order[position])
+
+    def get(self, game_id):
+        '''
+        Returns (board_size, history) of the game, or None if it is not there.
+        '''
+        index = self.find(game_id)
+        if index is None:
+            return None
+        board_size = int(self.meta['board_size'][index])
+        return board_size, [divmod(move, board_size) for move in self.game_moves(index).tolist()]
+
+    def chunks(self, chunk=CHUNK):
+        '''
+        Yields (meta, offsets, moves) views of chunk games at a time. offsets
+        are relative to the returned moves and hold one entry more than meta.
+        '''
+        for start in range(0, self.num_games, chunk):
+            stop = min(start + chunk, self.num_games)
+            first, last = int(self.offsets[start]), int(self.offsets[stop])
+            yield (self.meta[start:stop], self.offsets[start:stop + 1] - first,
+                   self.moves[first:last])
@@ -1,33 +1,97 @@
 import sqlite3
 from datetime import datetime
 
+PAGE_SIZE = 1000
+
 
 class game_db_api:
+    '''
+    Games table of a SQLite database, in WAL mode so that readers do not
+    block the writer, with indexes on the columns games are looked up by.
+    Every value goes through a bound parameter; the table name cannot, so
+    it has to be a plain identifier.
+    '''
+
     def __init__(self, db_path, table_name) -> None:
+        if not table_name.isidentifier():
+            raise ValueError(f'Invalid table name {table_name!r}')
         self.db = sqlite3.connect(db_path)
         self.table_name = table_name
+        self.db.execute('PRAGMA journal_mode=WAL')
+        # With WAL a commit is durable once checkpointed, which is enough for game records.
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute(f'CREATE TABLE IF NOT EXISTS {table_name} ('
+                        'game_id INTEGER PRIMARY KEY AUTOINCREMENT, player_1 TEXT, player_2 TEXT, '
+                        'winner TEXT NOT NULL, is_agent_play INTEGER NOT NULL, curr_time BLOB)')
+        for column in ('player_1', 'player_2', 'is_agent_play'):
+            self.db.execute(f'CREATE INDEX IF NOT EXISTS {table_name}_{column} '
+                            f'ON {table_name} ({column})')
+        self.db.commit()
+        self.insert_sql = (f'INSERT INTO {table_name} '
+                           '(player_1, player_2, winner, is_agent_play, curr_time) VALUES (?, ?, ?, ?, ?)')
 
     def add_game(self, player_1: str, player_2: str, winner: str, is_agent_play: bool):
-        cursor = self.db.execute(
-            f'INSERT INTO {self.table_name} (player_1, player_2, winner, is_agent_play, curr_time) \
-            VALUES (?, ?, ?, ?, ?);',
-            (player_1, player_2, winner, int(is_agent_play), str(datetime.now()))
-        )
+        cursor = self.db.execute(self.insert_sql,
+                                 (player_1, player_2, winner, int(is_agent_play), str(datetime.now())))
 
         self.db.commit()
         return cursor.lastrowid
 
+    def add_games_bulk(self, games, commit=True):
+        '''
+        Inserts (player_1, player_2, winner, is_agent_play) rows in a single
+        transaction and returns their game ids. With commit=False the
+        transaction is left open for the caller to commit.
+        '''
+        curr_time = str(datetime.now())
+        rows = [(player_1, player_2, winner, int(is_agent_play), curr_time)
+                for player_1, player_2, winner, is_agent_play in games]
+        if not rows:
+            return []
+        if not self.db.in_transaction:
+            # Holds the write lock from here, so the new ids are consecutive.
+            self.db.execute('BEGIN IMMEDIATE')
+        self.db.executemany(self.insert_sql, rows)
+        last_id = self.db.execute('SELECT last_insert_rowid()').fetchone()[0]
+        if commit:
+            self.db.commit()
+        return list(range(last_id - len(rows) + 1, last_id + 1))
+
     def get_game_by_username(self, username):
-        return self.db.execute(f'SELECT * FROM {self.table_name} \
-            WHERE player_1="{username}" OR player_2="{username}";')
+        return self.db.execute(f'SELECT * FROM {self.table_name} WHERE player_1 = ? '
+                               f'UNION SELECT * FROM {self.table_name} WHERE player_2 = ? '
+                               'ORDER BY game_id', (username, username))
 
     def get_game_by_id(self, id):
-        return self.db.execute(f"SELECT * FROM {self.table_name} \
-            WHERE game_id={id}")
+        return self.db.execute(f'SELECT * FROM {self.table_name} WHERE game_id = ?', (id,))
 
     def get_agent_games(self):
-        return self.db.execute(f"SELCT * FROM {self.table_name} \
-            WHERE is_agent_play=1")
+        return self.db.execute(f'SELECT * FROM {self.table_name} WHERE is_agent_play = 1')
 
     def get_games(self):
-        return self.db.execute(f"SELECT * FROM {self.table_name}")
+        return self.db.execute(f'SELECT * FROM {self.table_name}')
+
+    def get_games_page(self, after_id=0, limit=PAGE_SIZE, username=None):
+        '''
+        Returns up to limit games with an id above after_id in id order,
+        optionally only those of username. Pass the id of the last game of
+        a page to get the next one.
+        '''
+        if username is None:
+            return self.db.execute(f'SELECT * FROM {self.table_name} WHERE game_id > ? '
+                                   'ORDER BY game_id LIMIT ?', (after_id, limit)).fetchall()
+        return self.db.execute(f'SELECT * FROM (SELECT * FROM {self.table_name} WHERE player_1 = ? '
+                               f'UNION SELECT * FROM {self.table_name} WHERE player_2 = ?) '
+                               'WHERE game_id > ? ORDER BY game_id LIMIT ?',
+                               (username, username, after_id, limit)).fetchall()
+
+    def iter_games(self, after_id=0, page_size=PAGE_SIZE, username=None):
+        '''
+        Yields all games with an id above after_id, page by page.
+        '''
+        while True:
+            page = self.get_games_page(after_id, page_size, username)
+            yield from page
+            if len(page) < page_size:
+                return
+            after_id = page[-1][0]
@@ -1,33 +1,65 @@
-import pickle
+import logging
+from datetime import datetime
+from pathlib import Path
 
 import numpy as np
+from hex.board import Hex
 from hex.gui.draw_board import visualize_board
 from tabulate import tabulate
 
+from db.corpus import CorpusReader
 from db.db_api import game_db_api
+from db.record_store import RecordStore, migrate_datafile
 
 DB_PATH = 'db/game_storage_db.db'
 TABLE_NAME = 'games'
-DATAFILE_PATH = 'db/game_storage.dat'
+DATAFILE_PATH = 'db/game_records.bin'
+# Pickle datafile of the games saved before the record store, its games
+# are copied into the record store when it is opened, see open_records.
+PICKLE_DATAFILE_PATH = 'db/game_storage.dat'
+# Memory mapped corpus of bulk self-play games, see db.corpus.
+CORPUS_PATH = 'db/corpus'
+
+
+def open_records(db: game_db_api, datafile_path, pickle_datafile_path=PICKLE_DATAFILE_PATH):
+    '''
+    Opens the record store, first copying into it the games of the pickle
+    datafile, if there is one, that it is missing.
+    '''
+    records = RecordStore(db.db, datafile_path)
+    if pickle_datafile_path is not None and Path(pickle_datafile_path).exists():
+        copied = migrate_datafile(pickle_datafile_path, records)
+        if copied:
+            logging.info(f'Copied {copied} games from {pickle_datafile_path} to {datafile_path}.')
+    return records
 
 
 class GameSaver:
     '''
-    A class for saving game in the pickle file by indexing in the db
+    A class for saving game in the record store by indexing in the db
     '''
 
-    def __init__(self, db_path, table_name, datafile_path):
+    def __init__(self, db_path, table_name, datafile_path, pickle_datafile_path=PICKLE_DATAFILE_PATH):
         self.datafile_path = datafile_path
         self.db = game_db_api(db_path, table_name)
+        self.records = open_records(self.db, datafile_path, pickle_datafile_path)
 
     def save_game_history(self, id, history, board_size):
-        with open(self.datafile_path, 'ab') as dtfile:
-            data = {'id': id, 'game': history, 'board_size': board_size}
-            pickle.dump(data, dtfile)
+        self.records.add(id, history, board_size)
 
     def save(self, player_1: str, player_2: str, winner: str, is_agent_play: bool, game_history: list, board_size: int):
-        id = self.db.add_game(player_1, player_2, winner, is_agent_play)
-        self.save_game_history(id, game_history, board_size)
+        return self.save_many([(player_1, player_2, winner, is_agent_play, game_history, board_size)])[0]
+
+    def save_many(self, games: list):
+        '''
+        Saves (player_1, player_2, winner, is_agent_play, game_history, board_size)
+        tuples with one db transaction and one write to the datafile.
+        '''
+        ids = self.db.add_games_bulk([game[:4] for game in games], commit=False)
+        self.records.append([(id, history, board_size)
+                             for id, (*_, history, board_size) in zip(ids, games)], commit=False)
+        self.db.db.commit()
+        return ids
 
 
 class GameStorageAPI:
@@ -35,19 +67,41 @@ class GameStorageAPI:
     User front front end for db.
     '''
 
-    def __init__(self, db_path, table_name, datafile_path) -> None:
+    def __init__(self, db_path, table_name, datafile_path, corpus_path=CORPUS_PATH,
+                 pickle_datafile_path=PICKLE_DATAFILE_PATH) -> None:
         self.datafile_path = datafile_path
         self.db = game_db_api(db_path, table_name)
+        self.records = open_records(self.db, datafile_path, pickle_datafile_path)
+        self.corpus = None
+        if corpus_path is not None and (Path(corpus_path) / 'header').exists():
+            self.corpus = CorpusReader(corpus_path)
 
     def search_datafile(self, id):
-        with open(self.datafile_path, 'rb') as dtfile:
-            while True:
-                try:
-                    curr_dict = pickle.load(dtfile)
-                    if curr_dict['id'] == id:
-                        return curr_dict['board_size'], curr_dict['game']
-                except EOFError:
-                    break
+        '''
+        Returns (board_size, move history) of the game, None if it is not
+        stored. Negative ids are games only in the corpus, the others are
+        read from the record store, or else from the corpus.
+        '''
+        game = self.records.get(id) if id >= 0 else None
+        if game is None and self.corpus is not None:
+            game = self.corpus.get(id)
+        return game
+
+    def corpus_games_by_username(self, username):
+        '''
+        Rows shaped like those of the games table for the games of username
+        that are only in the corpus.
+        '''
+        if self.corpus is None:
+            return []
+        meta = self.corpus.meta
+        name = username.encode()[:32]
+        found = np.flatnonzero((meta['game_id'] < 0)
+                               & ((meta['player_1'] == name) | (meta['player_2'] == name)))
+        return [(int(record['game_id']), record['player_1'].decode(), record['player_2'].decode(),
+                 Hex.legend[int(record['winner'])], int(record['is_agent_play']),
+                 str(datetime.fromtimestamp(record['timestamp'])))
+                for record in meta[found]]
 
     @staticmethod
     def convert_to_board(move_history, size):
@@ -63,12 +117,12 @@ class GameStorageAPI:
             print()
             username = input("Enter username to retrieve games: ")
 
-            cursor = self.db.get_game_by_username(username)
+            rows = [*self.db.get_game_by_username(username), *self.corpus_games_by_username(username)]
 
-            if len(list(self.db.get_game_by_username(username))) == 0:
+            if len(rows) == 0:
                 print("No game entries found with this username.\n")
             else:
-                data = [[i + 1, *row] for i, row in enumerate(list(cursor))]
+                data = [[i + 1, *row] for i, row in enumerate(rows)]
 
                 for i in range(len(data)):
                     if bool(data[i][5]):
@@ -85,8 +139,11 @@ class GameStorageAPI:
                 print()
 
                 id = int(input("Select game by DB_ID: "))
-                game_info = list(self.db.get_game_by_id(id))[0]
-                board_size, game_history = self.search_datafile(id)
+                game = self.search_datafile(id)
+                if game is None:
+                    print("No moves stored for this game.")
+                    continue
+                board_size, game_history = game
 
                 visualize_board(GameStorageAPI.convert_to_board(game_history, board_size),
                                 move_order=game_history, plot=True)
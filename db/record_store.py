@@ -0,0 +1,163 @@
+"""
+Binary store of game move histories with a byte offset index in SQLite.
+
+Every record is a small header followed by the moves as flat cell indices
+(i*size + j), one byte each on boards of up to 16x16 and two bytes above:
+
+    game_id uint32 | board_size uint8 | num_moves uint16 | moves
+
+The records file is append only. The game_records table maps a game id to
+the offset of its moves, so reading a game is one index lookup and one
+read. The header keeps the records file readable without the index.
+
+GameSaver and GameStorageAPI copy in the games of the pickle datafile used
+before when they open the store. It can also be converted by hand with
+
+    python -m db.record_store db/game_storage.dat db/game_storage_db.db db/game_records.bin
+"""
+import pickle
+import sqlite3
+import struct
+import sys
+
+import numpy as np
+
+HEADER = struct.Struct('<IBH')
+INDEX_TABLE = 'game_records'
+
+
+def move_dtype(board_size):
+    '''
+    Little endian dtype of the moves of a board size.
+    '''
+    return np.dtype('<u1' if board_size*board_size <= 256 else '<u2')
+
+
+def encode_moves(history, board_size):
+    return np.array([i*board_size + j for i, j in history], dtype=move_dtype(board_size))
+
+
+def decode_moves(data, board_size):
+    moves = np.frombuffer(data, dtype=move_dtype(board_size))
+    return [divmod(index, board_size) for index in moves.tolist()]
+
+
+class RecordStore:
+    '''
+    Move histories of games in a binary records file, indexed by game id in
+    the game_records table of a SQLite database.
+    '''
+
+    def __init__(self, connection: sqlite3.Connection, records_path) -> None:
+        self.db = connection
+        self.records_path = records_path
+        self.db.execute(f'CREATE TABLE IF NOT EXISTS {INDEX_TABLE} ('
+                        'game_id INTEGER PRIMARY KEY, offset INTEGER NOT NULL, '
+                        'board_size INTEGER NOT NULL, num_moves INTEGER NOT NULL)')
+        self.db.commit()
+
+    def append(self, games, commit=True):
+        '''
+        Appends (game_id, history, board_size) records with one write and
+        indexes them in one transaction, left open if commit is False.
+        '''
+        rows = []
+        with open(self.records_path, 'ab') as records:
+            offset = records.seek(0, 2)
+            chunks = []
+            for game_id, history, board_size in games:
+                moves = encode_moves(history, board_size)
+                chunks.append(HEADER.pack(game_id, board_size, len(moves)))
+                chunks.append(moves.tobytes())
+                offset += HEADER.size
+                rows.append((game_id, offset, board_size, len(moves)))
+                offset += moves.nbytes
+            records.write(b''.join(chunks))
+        self.db.executemany(f'INSERT OR REPLACE INTO {INDEX_TABLE} '
+                            '(game_id, offset, board_size, num_moves) VALUES (?, ?, ?, ?)', rows)
+        if commit:
+            self.db.commit()
+
+    def add(self, game_id, history, board_size):
+        self.append([(game_id, history, board_size)])
+
+    def get(self, game_id):
+        '''
+        Returns (board_size, history) of the game, or None if it is not stored.
+        '''
+        row = self.db.execute(f'SELECT offset, board_size, num_moves FROM {INDEX_TABLE} '
+                              'WHERE game_id = ?', (game_id,)).fetchone()
+        if row is None:
+            return None
+        offset, board_size, num_moves = row
+        with open(self.records_path, 'rb') as records:
+            records.seek(offset)
+            data = records.read(num_moves * move_dtype(board_size).itemsize)
+        return board_size, decode_moves(data, board_size)
+
+    def __contains__(self, game_id):
+        return self.db.execute(f'SELECT 1 FROM {INDEX_TABLE} WHERE game_id = ?',
+                               (game_id,)).fetchone() is not None
+
+    def __len__(self):
+        return self.db.execute(f'SELECT COUNT(*) FROM {INDEX_TABLE}').fetchone()[0]
+
+
+# Globals needed to unpickle numpy integers, which agents may have played as moves.
+NUMPY_SCALAR_GLOBALS = {('numpy.core.multiarray', 'scalar'), ('numpy._core.multiarray', 'scalar'),
+                        ('numpy', 'dtype')}
+
+
+class DataOnlyUnpickler(pickle.Unpickler):
+    '''
+    Unpickler of plain data (dicts, lists, tuples, numbers, strings and
+    numpy scalars), refusing to load any other class or function.
+    '''
+
+    def find_class(self, module, name):
+        if (module, name) in NUMPY_SCALAR_GLOBALS:
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f'Refusing to load {module}.{name}')
+
+
+def read_pickle_datafile(datafile_path):
+    '''
+    Yields (game_id, history, board_size) from a datafile of pickled records.
+    '''
+    with open(datafile_path, 'rb') as dtfile:
+        while True:
+            try:
+                record = DataOnlyUnpickler(dtfile).load()
+            except EOFError:
+                return
+            yield (int(record['id']), [(int(i), int(j)) for i, j in record['game']],
+                   int(record['board_size']))
+
+
+def migrate_datafile(datafile_path, store: RecordStore, batch=10000):
+    '''
+    Copies the games of a pickle datafile missing from store into it.
+    Returns the number of games copied.
+    '''
+    copied = 0
+    games = []
+    for game in read_pickle_datafile(datafile_path):
+        if game[0] in store:
+            continue
+        games.append(game)
+        if len(games) == batch:
+            store.append(games)
+            copied += len(games)
+            games = []
+    if games:
+        store.append(games)
+        copied += len(games)
+    return copied
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 4:
+        sys.exit('usage: python -m db.record_store DATAFILE DB RECORDS')
+    datafile_path, db_path, records_path = sys.argv[1:]
+    store = RecordStore(sqlite3.connect(db_path), records_path)
+    print(f'Copied {migrate_datafile(datafile_path, store)} games to {records_path}.')
@@ -0,0 +1,161 @@
+"""
+Export of stored games as training data for policy and value networks.
+
+Every position of a game, before each of its moves, becomes one sample:
+
+    planes    uint8 [3, size, size]  P1 stones, P2 stones, all ones if P1 is to move
+    move      int16                  the move played, as a flat cell index (i*size + j)
+    outcome   int8                   1 if the player to move won the game, else -1
+
+Rotating the board by 180 degrees keeps both players' edges, so with
+augmentation every position is also emitted rotated. On the flat index
+that rotation is index -> size*size - 1 - index.
+
+Games are read one page or chunk at a time and samples leave in fixed
+size batches, so memory does not grow with the number of games.
+
+    python -m db.training_data OUT_DIR --size 6 [--corpus db/corpus] [--batch 65536]
+"""
+import argparse
+import json
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+from hex.board import P1, P2, Hex
+
+from db.corpus import CorpusReader
+from db.db_api import game_db_api
+from db.record_store import RecordStore
+
+BATCH_SIZE = 1 << 16
+NUM_PLANES = 3
+WINNER_BY_LEGEND = {legend: player for player, legend in Hex.legend.items()}
+
+
+class TrainingBatch(NamedTuple):
+    planes: np.ndarray
+    moves: np.ndarray
+    outcomes: np.ndarray
+
+
+def store_games(db: game_db_api, records: RecordStore):
+    '''
+    Yields (game_id, board_size, moves, winner) of the games in the games
+    table with a move history in the record store.
+    '''
+    for game_id, _, _, winner, *_ in db.iter_games():
+        game = records.get(game_id)
+        if game is None or winner not in WINNER_BY_LEGEND:
+            continue
+        board_size, history = game
+        moves = np.array([i*board_size + j for i, j in history], dtype=np.int64)
+        yield game_id, board_size, moves, WINNER_BY_LEGEND[winner]
+
+
+def corpus_games(corpus: CorpusReader):
+    '''
+    Yields (game_id, board_size, moves, winner) of the games in a corpus.
+    '''
+    for meta, offsets, moves in corpus.chunks():
+        for k, (game_id, board_size, winner) in enumerate(
+                zip(meta['game_id'].tolist(), meta['board_size'].tolist(), meta['winner'].tolist())):
+            yield game_id, board_size, moves[offsets[k]:offsets[k + 1]].astype(np.int64), winner
+
+
+def game_samples(moves, size, winner, augment=True):
+    '''
+    Replays one game and returns the planes, moves and outcomes of all its
+    positions, followed by their rotations if augment is set.
+    '''
+    length = len(moves)
+    n = size*size
+    turn = np.arange(length)
+    # Move number that filled every cell, length for the cells left empty.
+    placed = np.full(n, length)
+    placed[moves] = turn
+    filled = placed[None, :] < turn[:, None]
+    by_p1 = placed % 2 == 0
+
+    planes = np.empty((length, NUM_PLANES, n), np.uint8)
+    planes[:, 0] = filled & by_p1
+    planes[:, 1] = filled & ~by_p1
+    planes[:, 2] = (turn % 2 == 0)[:, None]
+    moves = moves.astype(np.int16)
+    outcomes = np.where((turn % 2 == 0) == (winner == P1), 1, -1).astype(np.int8)
+    if augment:
+        planes = np.concatenate((planes, planes[:, :, ::-1]))
+        moves = np.concatenate((moves, n - 1 - moves))
+        outcomes = np.concatenate((outcomes, outcomes))
+    return planes.reshape(-1, NUM_PLANES, size, size), moves, outcomes
+
+
+def training_batches(games, size, batch_size=BATCH_SIZE, augment=True):
+    '''
+    Yields TrainingBatch of batch_size samples from the games of the given
+    board size, the last one possibly smaller. games yields (game_id,
+    board_size, moves, winner) as store_games and corpus_games do.
+    '''
+    pending = []
+    count = 0
+    for _, board_size, moves, winner in games:
+        if board_size != size or len(moves) == 0 or winner not in (P1, P2):
+            continue
+        samples = game_samples(moves, size, winner, augment)
+        pending.append(samples)
+        count += len(samples[1])
+        while count >= batch_size:
+            batch = [np.concatenate(column) for column in zip(*pending)]
+            yield TrainingBatch(*(column[:batch_size] for column in batch))
+            pending = [tuple(column[batch_size:] for column in batch)]
+            count -= batch_size
+    if count:
+        yield TrainingBatch(*(np.concatenate(column) for column in zip(*pending)))
+
+
+def write_shards(batches, directory, size, compress=False):
+    '''
+    Writes every batch to its own shard_NNNNN.npz in directory together
+    with an index.json listing the shards. Returns the number of samples.
+    '''
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    save = np.savez_compressed if compress else np.savez
+    shards = []
+    for number, batch in enumerate(batches):
+        name = f'shard_{number:05d}.npz'
+        save(directory / name, **batch._asdict())
+        shards.append({'file': name, 'samples': len(batch.moves)})
+    with open(directory / 'index.json', 'w') as index:
+        json.dump({'board_size': size, 'planes': ['P1', 'P2', 'P1 to move'],
+                   'samples': sum(shard['samples'] for shard in shards), 'shards': shards},
+                  index, indent=1)
+    return sum(shard['samples'] for shard in shards)
+
+
+def main(argv=None):
+    from db.game_storage_api import DATAFILE_PATH, DB_PATH, TABLE_NAME
+
+    parser = argparse.ArgumentParser(description='Export stored games as training data.')
+    parser.add_argument('out_dir')
+    parser.add_argument('--size', type=int, required=True, help='board size of the games to export')
+    parser.add_argument('--corpus', help='read the games from this corpus instead of the game database')
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--records', default=DATAFILE_PATH)
+    parser.add_argument('--batch', type=int, default=BATCH_SIZE, help='samples per shard')
+    parser.add_argument('--no-augment', action='store_true', help='leave out the rotated positions')
+    parser.add_argument('--compress', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        games = corpus_games(CorpusReader(args.corpus))
+    else:
+        db = game_db_api(args.db, TABLE_NAME)
+        games = store_games(db, RecordStore(db.db, args.records))
+    batches = training_batches(games, args.size, args.batch, not args.no_augment)
+    samples = write_shards(batches, args.out_dir, args.size, args.compress)
+    print(f'Wrote {samples} samples to {args.out_dir}.')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 import logging as log
+from threading import Event, Thread
 
 from hex.board import Hex
 
@@ -13,11 +14,17 @@ class HexAgent:
 
     def __init__(self, name, best_move_func,
                  description='',
-                 setup_func=lambda: None):
+                 setup_func=lambda: None,
+                 ponder_func=None,
+                 seed_func=None):
         self.name = name
         self.description = description
         self.best_move_func = best_move_func
         self.setup_func = setup_func
+        self.ponder_func = ponder_func
+        self.seed_func = seed_func
+        self.ponder_thread = None
+        self.ponder_stop = Event()
         if self.name in HexAgent.agent_dict:
             raise AgentError(f'Agent {self.name} already exists')
         HexAgent.agent_dict[self.name] = self
@@ -27,6 +34,34 @@ class HexAgent:
     def best_move(self, state: Hex):
         return self.best_move_func(state)
 
+    def seed(self, value):
+        '''
+        Seeds the random state the agent keeps beyond the random and
+        numpy.random modules, if it has any, for reproducible games.
+        '''
+        if self.seed_func is not None:
+            self.seed_func(value)
+
+    def start_pondering(self, state: Hex):
+        '''
+        Runs ponder_func(state, stop_event) in a background thread, if the
+        agent has one, until stop_pondering is called. state must not be
+        modified in the mean time.
+        '''
+        if self.ponder_func is None or self.ponder_thread is not None:
+            return
+        self.ponder_stop.clear()
+        self.ponder_thread = Thread(target=self.ponder_func, args=(state, self.ponder_stop),
+                                    daemon=True)
+        self.ponder_thread.start()
+
+    def stop_pondering(self):
+        if self.ponder_thread is None:
+            return
+        self.ponder_stop.set()
+        self.ponder_thread.join()
+        self.ponder_thread = None
+
     def __repr__(self) -> str:
         return f'Agent {self.name} ({self.description})'
 
@@ -45,8 +80,8 @@ class HexAgent:
                     HexAgent.agent_dict[agent].setup_func()
                     HexAgent.setup_status[agent] = True
                     log.info(f'Agent {agent} successfully set up')
-        else:
-            agent = HexAgent.agent_dict[name]
+        elif not HexAgent.setup_status[name]:
+            agent = HexAgent.get_agent(name)
             agent.setup_func()
             HexAgent.setup_status[name] = True
             log.info(f'Agent {agent} successfully set up')
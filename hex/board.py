@@ -1,6 +1,6 @@
-from collections import defaultdict
-from queue import Queue
-from random import choice
+from collections import defaultdict, deque
+from functools import lru_cache
+from random import randrange
 from string import ascii_letters
 from typing import NamedTuple
 
@@ -12,10 +12,11 @@ P1 = 1
 EMPTY = 0
 P2 = -1
 
-EDGE_START = 's'
-EDGE_FINISH = 'f'
-
 NEIGHBOUR_PATTERNS = ((-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0))
+NO_NEIGHBOUR = -1
+NO_EDGE = -1
+# Connection distance of cells the player cannot reach, larger than any distance.
+NO_PATH = 1 << 16
 
 RULES_OF_HEX = (f'{"_"*80}',
                 'Rules of Hex: ',
@@ -33,7 +34,8 @@ class player(NamedTuple):
 def shortest_connection(board, size, player):
     """
     If board is terminated returns the winning connection.
-    Uses BFS to find the shortest path.
+    Uses BFS over the player's stones, from their first edge, to find the
+    shortest path.
 
     Args:
         board (np.ndarray): A numpy array representing the board in NxN shape.
@@ -41,68 +43,118 @@ def shortest_connection(board, size, player):
         player (int): player number
 
     Returns:
-        List containg tuples representing cells in the shortest path.
+        List containg tuples representing cells in the shortest path, from the
+        player's last edge to the first. Empty if the player is not connected.
+    """
+    topo = topology(size)
+    start_mask, finish_mask = topo.edge_masks[player]
+    own = (np.asarray(board).ravel() == player).tolist()
+    finish = finish_mask.tolist()
+    adjacent = topo.adjacent
+
+    sources = [index for index in np.flatnonzero(start_mask).tolist() if own[index]]
+    parent = [NO_NEIGHBOUR]*topo.n
+    seen = [False]*topo.n
+    for index in sources:
+        seen[index] = True
+    queue = deque(sources)
+    while queue:
+        index = queue.popleft()
+        if finish[index]:
+            # Walking the parents back to the first edge.
+            path = []
+            while index != NO_NEIGHBOUR:
+                path.append(divmod(index, size))
+                index = parent[index]
+            return path
+        for neighbour in adjacent[index]:
+            if own[neighbour] and not seen[neighbour]:
+                seen[neighbour] = True
+                parent[neighbour] = index
+                queue.append(neighbour)
+    return []
+
+
+def connection_distances(board, size, player, from_finish=False):
     """
-    EDGE_START = 'START'
-    EDGE_FINISH = 'END'
+    Distance of every cell from the player's first edge, or last edge if
+    from_finish is set: the fewest empty cells, counting the cell itself,
+    the player has to fill to join it to that edge. The player's own stones
+    cost nothing and the opponent's block, getting NO_PATH. Uses a 0-1 BFS.
 
-    # Generating graph upon which BFS is applied
-    graph_dict = defaultdict(list)
-    for i, j in np.ndindex(size, size):
-        if board[i, j] != player:
+    Args:
+        board (np.ndarray): A numpy array representing the board in NxN shape.
+        size (int): board size (N)
+        player (int): player number
+        from_finish (bool): measure from the player's last edge instead
+
+    Returns:
+        np.ndarray: int32 distance of every flat cell index (i*size + j).
+    """
+    topo = topology(size)
+    flat = np.asarray(board).ravel()
+    # Cost of entering every cell, None for the opponent's stones.
+    cost = np.where(flat == player, 0, 1).tolist()
+    for index in np.flatnonzero(flat == -player).tolist():
+        cost[index] = None
+    adjacent = topo.adjacent
+
+    distance = [NO_PATH]*topo.n
+    queue = deque()
+    for index in np.flatnonzero(topo.edge_masks[player][1 if from_finish else 0]).tolist():
+        if cost[index] is None:
             continue
+        distance[index] = cost[index]
+        if cost[index]:
+            queue.append(index)
+        else:
+            queue.appendleft(index)
+    while queue:
+        index = queue.popleft()
+        current = distance[index]
+        for neighbour in adjacent[index]:
+            step = cost[neighbour]
+            if step is None or current + step >= distance[neighbour]:
+                continue
+            distance[neighbour] = current + step
+            if step:
+                queue.append(neighbour)
+            else:
+                queue.appendleft(neighbour)
+    return np.array(distance, dtype=np.int32)
+
+
+def connection_distance(board, size, player):
+    """
+    Fewest empty cells the player has to fill to connect their edges,
+    0 once connected and NO_PATH if the opponent has cut them off.
+    """
+    distances = connection_distances(board, size, player)
+    return int(distances[topology(size).edge_masks[player][1]].min())
+
+
+def distance_evaluation(board, size):
+    """
+    Difference of the two players' connection distances, positive when P1
+    needs fewer cells than P2 to connect.
+    """
+    return connection_distance(board, size, P2) - connection_distance(board, size, P1)
+
 
-        for neighbour in neighbours((i, j), size):
-            if board[neighbour] == player:
-                graph_dict[(i, j)].append(neighbour)
-
-        if player == P1:
-            if i == 0:
-                graph_dict[EDGE_START].append((i, j))
-                graph_dict[(i, j)].append(EDGE_START)
-            elif i == (size - 1):
-                graph_dict[EDGE_FINISH].append((i, j))
-                graph_dict[(i, j)].append(EDGE_FINISH)
-
-        if player == P2:
-            if j == 0:
-                graph_dict[EDGE_START].append((i, j))
-                graph_dict[(i, j)].append(EDGE_START)
-            elif j == (size - 1):
-                graph_dict[EDGE_FINISH].append((i, j))
-                graph_dict[(i, j)].append(EDGE_FINISH)
-
-    # BFS algorithm to find the cost of each node.
-    cost_dict = {}
-    cost_dict[EDGE_START] = 0
-    queue = Queue()
-    queue.put(EDGE_START)
-    while not(queue.empty()):
-        node = queue.get()
-        node_cost = cost_dict[node]
-        for neighbour in graph_dict[node]:
-            if cost_dict.get(neighbour, None) == None:
-                cost_dict[neighbour] = node_cost + 1
-                if neighbour == EDGE_FINISH:
-                    break
-                queue.put(neighbour)
-
-    # Iterating backword to get the shortest path.
-    shortest_path = []
-    node = EDGE_FINISH
-    while node != EDGE_START:
-        next_node = None
-        next_node_value = float('inf')
-        for neighbour in graph_dict[node]:
-            neighbour_value = cost_dict.get(neighbour, float('inf'))
-            if neighbour_value < next_node_value:
-                next_node_value = neighbour_value
-                next_node = neighbour
-        node = next_node
-        shortest_path.append(node)
-    shortest_path.remove(EDGE_START)
-
-    return shortest_path
+def shortest_path_cells(board, size, player):
+    """
+    Boolean mask over flat cell indices of the empty cells lying on some
+    shortest connection of the player, good candidates for either side to
+    play. All False if the player is already connected or cut off.
+    """
+    flat = np.asarray(board).ravel()
+    from_start = connection_distances(flat, size, player)
+    from_finish = connection_distances(flat, size, player, from_finish=True)
+    best = int(from_start[topology(size).edge_masks[player][1]].min())
+    if best == 0 or best >= NO_PATH:
+        return np.zeros(size*size, dtype=bool)
+    # An empty cell is counted in both distances.
+    return (flat == EMPTY) & (from_start + from_finish - 1 == best)
 
 
 def move_to_string(move):
@@ -135,17 +187,87 @@ def neighbours(cell, size):
             if (0 <= dx+x < size and 0 <= dy+y < size)]
 
 
+class Topology:
+    """
+    Adjacency and edges of a board size over flat cell indices (i*size + j).
+    Built once per size by topology(size) and shared by all board code.
+
+    Attributes:
+        size (int): board size (N)
+        n (int): number of cells (N*N)
+        start (int): id of the virtual node joined to the first edge of a player, n
+        finish (int): id of the virtual node joined to the last edge of a player, n + 1
+        cells (np.ndarray): int16[n, 2] row and column of every cell
+        neighbours (np.ndarray): int16[n, 6] neighbour indices of every cell,
+            padded with NO_NEIGHBOUR
+        adjacent (tuple): neighbour indices of every cell as tuples, for python loops
+        edge_masks (dict): (start, finish) boolean masks over the cells of each player's edges
+        edge (dict): start, finish or NO_EDGE for every cell, for each player
+    """
+
+    def __init__(self, size) -> None:
+        self.size = size
+        self.n = size*size
+        self.start = self.n
+        self.finish = self.n + 1
+
+        rows, columns = np.divmod(np.arange(self.n), size)
+        self.cells = np.stack([rows, columns], axis=1).astype(np.int16)
+
+        self.neighbours = np.full((self.n, 6), NO_NEIGHBOUR, dtype=np.int16)
+        for index in range(self.n):
+            cells = neighbours(divmod(index, size), size)
+            self.neighbours[index, :len(cells)] = [x*size + y for x, y in cells]
+        self.adjacent = tuple(tuple(int(x) for x in row if x != NO_NEIGHBOUR)
+                              for row in self.neighbours)
+
+        self.edge_masks = {P1: (rows == 0, rows == size - 1),
+                           P2: (columns == 0, columns == size - 1)}
+        self.edge = {}
+        for player, (start_mask, finish_mask) in self.edge_masks.items():
+            edge = np.full(self.n, NO_EDGE, dtype=np.int64)
+            edge[finish_mask] = self.finish
+            edge[start_mask] = self.start
+            self.edge[player] = tuple(edge.tolist())
+
+        for array in (self.cells, self.neighbours, *self.edge_masks[P1], *self.edge_masks[P2]):
+            array.flags.writeable = False
+
+
+@lru_cache(maxsize=None)
+def topology(size):
+    """
+    Returns the Topology of a board size, computed once per size.
+    """
+    return Topology(size)
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(size):
+    """
+    Returns the Zobrist keys of a board size as a read only uint64 array of
+    shape (2, size*size), row 0 for P1 stones and row 1 for P2 stones.
+    The hash of a position is the XOR of the keys of its stones.
+    """
+    keys = np.random.default_rng(size).integers(0, 2**64, size=(2, size*size), dtype=np.uint64)
+    keys.flags.writeable = False
+    return keys
+
+
 def possible_moves(size, board):
     """
     Return a list of all moves possible in the current board state.
     Args:
         size(int): Size of the board.
-        board(numpy.ndarray): Current board state.
+        board(numpy.ndarray or int): Current board state, or the occupancy
+            bitmask of a HexBitBoard.
     returns:
         list: List of all possible moves.
     """
-    moves = [(x, y) for x in range(size)
-             for y in range(size) if board[x][y] == EMPTY]
+    if isinstance(board, int):
+        return [divmod(index, size) for index in range(size*size)
+                if not (board >> index) & 1]
+    moves = [tuple(cell) for cell in np.argwhere(board == EMPTY).tolist()]
     return moves
 
 
@@ -153,117 +275,256 @@ class HexException(Exception):
     pass
 
 
-class UnionFind:
+class EmptyCells:
     """
-    Unionfind data structure specialized for finding hex connections.
+    Set of the empty cells of a board as flat indices (i*size + j).
+    Removal swaps the cell with the last one of the set, so picking a random
+    cell, removing a cell and putting back the last removed cell are O(1),
+    and listing the set is O(k).
 
     Attributes:
-        parent (dict): Each group parent
-        rank (dict): Each group rank
-        groups (dict): Stores the groups and chain of cells
+        cells (list): the set is cells[:count], removed cells follow in removal order
+        position (list): index of every cell in cells
+        count (int): number of empty cells
     """
+    __slots__ = ('cells', 'position', 'count')
 
-    def __init__(self) -> None:
-        self.parent = {}
-        self.rank = {}
-        self.groups = {}
+    def __init__(self, n=0) -> None:
+        self.cells = list(range(n))
+        self.position = list(range(n))
+        self.count = n
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, index):
+        return self.position[index] < self.count
+
+    def remove(self, index):
+        cells, position = self.cells, self.position
+        last = self.count - 1
+        at = position[index]
+        cells[at], cells[last] = cells[last], index
+        position[cells[at]], position[index] = at, last
+        self.count = last
+
+    def restore(self, index):
+        """
+        Puts index back in the set, O(1) when it is the last removed cell.
+        """
+        cells, position = self.cells, self.position
+        at = position[index]
+        first_removed = self.count
+        cells[at], cells[first_removed] = cells[first_removed], index
+        position[cells[at]], position[index] = at, first_removed
+        self.count += 1
+
+    def random(self):
+        return self.cells[randrange(self.count)]
+
+    def indices(self):
+        return self.cells[:self.count]
+
+    def copy(self):
+        new = EmptyCells()
+        new.cells = self.cells[:]
+        new.position = self.position[:]
+        new.count = self.count
+        return new
+
+
+class ArrayUnionFind:
+    """
+    Unionfind over flat integer ids backed by plain lists, so that copying
+    it is a single slice per list. Used by the board states where cells are
+    indexed as i*size + j and the two edges as size*size and size*size + 1.
+    Unlike the dict based union-find it replaced it keeps no member lists,
+    groups are rebuilt on demand.
+
+    Attributes:
+        parent (list): Parent id of every element
+        rank (list): Rank of every element
+        trail (list): (list, index, old value) of every write to revert with
+            rollback, None when not recorded
+    """
+    __slots__ = ('parent', 'rank', 'trail')
+
+    def __init__(self, n=0) -> None:
+        self.parent = list(range(n))
+        self.rank = [0] * n
+        self.trail = None
 
     def join(self, x, y) -> bool:
         """
         Merge the groups of x and y if they were not already,
         return False if they were already merged, true otherwise.
-
-        Args:
-            x (tuple): game board cell
-            y (tuple): game board cell
-
         """
-        # Find root/parent node of x and y
         root_x = self.find(x)
         root_y = self.find(y)
-
-        # Return false if x and y are in the same group
         if root_x == root_y:
             return False
 
-        # Add the tree with the smaller rank to the one with the higher rank and delete the smaller tree.
-        if self.rank[root_x] < self.rank[root_y]:
-            self.parent[root_x] = root_y
-            self.groups[root_y].extend(self.groups[root_x])
-            del self.groups[root_x]
-
-        elif self.rank[root_x] > self.rank[root_y]:
-            self.parent[root_y] = root_x
-            self.groups[root_x].extend(self.groups[root_y])
-            del self.groups[root_y]
-
-        # If the trees have same rank, add one to the other and increase it's rank.
-        else:
-            self.parent[root_x] = root_y
-            self.rank[root_y] += 1
-            self.groups[root_y].extend(self.groups[root_x])
-            del self.groups[root_x]
-
+        rank = self.rank
+        if rank[root_x] > rank[root_y]:
+            root_x, root_y = root_y, root_x
+        if self.trail is not None:
+            self.trail.append((self.parent, root_x, root_x))
+            self.trail.append((rank, root_y, rank[root_y]))
+        self.parent[root_x] = root_y
+        if rank[root_x] == rank[root_y]:
+            rank[root_y] += 1
         return True
 
     def find(self, x):
         """
-        Get the root element of the group in which element x resides. 
-        Uses grandparent compression to compress the tree on each find 
-        operation so that future find operations are faster.
-        Args:
-            x (tuple): game board cell
+        Get the root element of the group in which element x resides,
+        halving the path on the way up.
         """
-        if x not in self.parent:
-            self.parent[x] = x
-            self.rank[x] = 0
-            self.groups[x] = [x]
+        parent = self.parent
+        trail = self.trail
+        while parent[x] != x:
+            grandparent = parent[parent[x]]
+            if grandparent != parent[x]:
+                if trail is not None:
+                    trail.append((parent, x, parent[x]))
+                parent[x] = grandparent
+            x = grandparent
+        return x
 
-        # If root node then return node itself.
-        parent_x = self.parent[x]
-        if x == parent_x:
-            return x
+    def connected(self, x, y) -> bool:
+        return self.find(x) == self.find(y)
 
-        parent_parent_x = self.parent[parent_x]
-        if parent_parent_x == parent_x:
-            return parent_x
+    @property
+    def groups(self):
+        """
+        Members of every group of more than one element keyed by root,
+        rebuilt from the parent list on each access.
+        """
+        groups = defaultdict(list)
+        for x in range(len(self.parent)):
+            groups[self.find(x)].append(x)
+        return {root: members for root, members in groups.items() if len(members) > 1}
 
-        # Compress treee by bringing passed node above by making it's parent, it's parent's parent
-        self.parent[x] = parent_parent_x
+    def rollback(self, mark):
+        """
+        Reverts the writes recorded in the trail after its first mark entries.
+        """
+        trail = self.trail
+        while len(trail) > mark:
+            values, index, old = trail.pop()
+            values[index] = old
 
-        return self.find(parent_parent_x)
+    def copy(self):
+        new = ArrayUnionFind()
+        new.parent = self.parent[:]
+        new.rank = self.rank[:]
+        return new
 
-    def connected(self, x, y) -> bool:
-        """
-        Check if two elements are conneced.
 
-        Args:
-            x (tuple): game board cell
-            y (tuple): game board cell
-        """
-        return self.find(x) == self.find(y)
+class BoardState:
+    """
+    Moves, undo and copies shared by HexBase and HexBitBoard, which keep
+    the stones (a board array or bitboards) and place and remove them.
 
+    With undoable=True every move records what it changed, so that undo()
+    can take it back without copying the state.
 
-class HexBase:
+    Attributes:
+        size (int): board size (N)
+        turn (int): player to move
+        groups (dict): ArrayUnionFind of each player, edges are size*size (start) and size*size + 1 (finish)
+        empty (EmptyCells): empty cells as flat indices (i*size + j)
+        hash (int): Zobrist hash of the position
+        winner (int): player who connected their edges, None while the game
+            is not over. Set by step, only the player who moved can win and
+            only through the group of the new stone.
+        history (list): what every move since the last commit changed, None
+            if the state is not undoable
+    """
 
-    def __init__(self, size):
+    def __init__(self, size, undoable=False):
         self.size = size
-        self.board = np.zeros((size, size), dtype=np.int8)
+        self.topology = topology(size)
         self.turn = P1
-        self.groups = {P1: UnionFind(), P2: UnionFind()}
+        self.groups = {P1: ArrayUnionFind(size*size + 2), P2: ArrayUnionFind(size*size + 2)}
+        self.empty = EmptyCells(size*size)
+        self.winner = None
+        self.hash = 0
+        self.history = None
+        if undoable:
+            self.commit()
+
+    def record(self, index):
+        """
+        Remembers what the move on index is about to change, if undoable.
+        """
+        if self.history is not None:
+            self.history.append((index, len(self.groups[P1].trail), len(self.groups[P2].trail),
+                                 self.winner))
 
-    @property
-    def winner(self):
+    def undo(self):
         """
-        Return a number corresponding to the winning player,
-        or none if the game is not over.
+        Takes back the last move made since the state became undoable
+        (or since the last commit).
         """
-        if self.groups[P2].connected(EDGE_START, EDGE_FINISH):
-            return P2
-        elif self.groups[P1].connected(EDGE_START, EDGE_FINISH):
-            return P1
-        else:
-            return None
+        if not self.history:
+            raise HexException("No move to undo.")
+        index, mark_p1, mark_p2, self.winner = self.history.pop()
+        self.groups[P1].rollback(mark_p1)
+        self.groups[P2].rollback(mark_p2)
+        player = opponent(self.turn)
+        self._remove(index, player)
+        self.empty.restore(index)
+        self.hash ^= int(zobrist_keys(self.size)[0 if player == P1 else 1, index])
+        self.turn = player
+
+    def commit(self):
+        """
+        Makes the state undoable and forgets the moves made so far,
+        which can no longer be undone.
+        """
+        self.history = []
+        for groups in self.groups.values():
+            groups.trail = []
+
+    def _copy_into(self, new, undoable):
+        """
+        Copies the state shared by both boards into new, whose stones the
+        subclass has copied. Moves made before the copy cannot be undone on it.
+        """
+        new.size = self.size
+        new.topology = self.topology
+        new.turn = self.turn
+        new.hash = self.hash
+        new.empty = self.empty.copy()
+        new.winner = self.winner
+        new.groups = {P1: self.groups[P1].copy(), P2: self.groups[P2].copy()}
+        new.history = None
+        if undoable:
+            new.commit()
+        return new
+
+    def legal_moves(self):
+        return [divmod(index, self.size) for index in self.empty.indices()]
+
+    def legal_indices(self):
+        """
+        Returns the empty cells as flat indices (i*size + j).
+        """
+        return self.empty.indices()
+
+    def random_move(self):
+        return divmod(self.empty.random(), self.size)
+
+
+class HexBase(BoardState):
+    """
+    Board state over an NxN numpy array of stones.
+    """
+
+    def __init__(self, size, undoable=False):
+        self.board = np.zeros((size, size), dtype=np.int8)
+        super().__init__(size, undoable)
 
     def step(self, cell):
         """
@@ -274,24 +535,150 @@ class HexBase:
             cell (tuple): row and column of the cell
             player (int): player by which stone has been placed
             coord_index: 0 for x, 1 for y to check for end condition row wise or column wise respectively
+
+        Returns:
+            The winner after the move, None if the game is not over.
         """
         player = self.turn
         if self.board[cell] == EMPTY:
             self.board[cell] = player
         else:
             raise HexException(f"Cell {cell} already occupied.")
+        index = cell[0]*self.size + cell[1]
+        self.record(index)
+        self.empty.remove(index)
+        self.hash ^= int(zobrist_keys(self.size)[0 if player == P1 else 1, index])
+
+        topo = self.topology
+        groups = self.groups[player]
+        edge = topo.edge[player][index]
+        if edge != NO_EDGE:
+            groups.join(edge, index)
+
+        flat = self.board.ravel()
+        for neighbour in topo.adjacent[index]:
+            if flat[neighbour] == player:
+                groups.join(neighbour, index)
+
+        if self.winner is None and groups.connected(topo.start, topo.finish):
+            self.winner = player
+        self.turn = opponent(player)
+        return self.winner
 
-        coord_index = 0 if player == P1 else 1
-        if cell[coord_index] == 0:
-            self.groups[player].join(EDGE_START, cell)
-        elif cell[coord_index] == self.size - 1:
-            self.groups[player].join(EDGE_FINISH, cell)
+    def _remove(self, index, player):
+        self.board[divmod(index, self.size)] = EMPTY
 
-        for neighbour in neighbours(cell, self.size):
-            if self.board[neighbour] == player:
-                self.groups[player].join(neighbour, cell)
+    def copy(self, undoable=False):
+        """
+        Returns an independent copy of the state, much cheaper than deepcopy.
+        Moves made before the copy cannot be undone on it.
+        """
+        new = HexBase.__new__(HexBase)
+        new.board = self.board.copy()
+        return self._copy_into(new, undoable)
 
-        self.turn = opponent(player)
+    def player_cells(self, player):
+        """
+        Returns a list of cells occupied by the player.
+        """
+        return [tuple(cell) for cell in np.argwhere(self.board == player).tolist()]
+
+
+class HexBitBoard(BoardState):
+    """
+    Compact alternative to HexBase with the same step/winner/turn interface.
+    Stones of each player are stored as a python int bitboard over flat cell
+    indices (i*size + j) and connections in an ArrayUnionFind, which makes
+    copy() a handful of int and list copies.
+
+    Attributes:
+        stones (dict): bitboard of each player's stones
+    """
+
+    def __init__(self, size, undoable=False):
+        self.stones = {P1: 0, P2: 0}
+        super().__init__(size, undoable)
+
+    @classmethod
+    def from_base(cls, base: HexBase):
+        """
+        Builds a bitboard state from the position of a HexBase.
+        """
+        state = cls(base.size)
+        for player in (P1, P2):
+            for i, j in base.player_cells(player):
+                state._place(i*base.size + j, player)
+        state.turn = base.turn
+        state.winner = base.winner
+        return state
+
+    @property
+    def occupied(self):
+        return self.stones[P1] | self.stones[P2]
+
+    @property
+    def board(self):
+        """
+        The position as an NxN numpy array, for code expecting HexBase.board.
+        """
+        board = np.zeros(self.size*self.size, dtype=np.int8)
+        for player in (P1, P2):
+            stones = self.stones[player]
+            board[[index for index in range(self.size*self.size) if (stones >> index) & 1]] = player
+        return board.reshape(self.size, self.size)
+
+    def _place(self, index, player):
+        topo = self.topology
+        self.stones[player] |= 1 << index
+        self.empty.remove(index)
+        self.hash ^= int(zobrist_keys(self.size)[0 if player == P1 else 1, index])
+        groups = self.groups[player]
+
+        edge = topo.edge[player][index]
+        if edge != NO_EDGE:
+            groups.join(edge, index)
+
+        stones = self.stones[player]
+        for neighbour in topo.adjacent[index]:
+            if (stones >> neighbour) & 1:
+                groups.join(neighbour, index)
+
+        if self.winner is None and groups.connected(topo.start, topo.finish):
+            self.winner = player
+
+    def step(self, cell):
+        """
+        Place a stone on the board for the player to move.
+
+        Args:
+            cell (tuple): row and column of the cell
+
+        Returns:
+            The winner after the move, None if the game is not over.
+        """
+        index = cell[0]*self.size + cell[1]
+        if (self.occupied >> index) & 1:
+            raise HexException(f"Cell {cell} already occupied.")
+        self.record(index)
+        self._place(index, self.turn)
+        self.turn = opponent(self.turn)
+        return self.winner
+
+    def _remove(self, index, player):
+        self.stones[player] &= ~(1 << index)
+
+    def copy(self, undoable=False):
+        new = HexBitBoard.__new__(HexBitBoard)
+        new.stones = self.stones.copy()
+        return self._copy_into(new, undoable)
+
+    def player_cells(self, player):
+        """
+        Returns a list of cells occupied by the player.
+        """
+        stones = self.stones[player]
+        return [divmod(index, self.size) for index in range(self.size*self.size)
+                if (stones >> index) & 1]
 
 
 class Hex(HexBase):
@@ -302,8 +689,9 @@ class Hex(HexBase):
 
     def __init__(self, size,
                  player_1=player('Undefined', False),
-                 player_2=player('Undefined', False)):
-        super().__init__(size)
+                 player_2=player('Undefined', False),
+                 undoable=False):
+        super().__init__(size, undoable)
         self.move_history = []
         self.players = {P1: player_1, P2: player_2}
 
@@ -312,7 +700,14 @@ class Hex(HexBase):
         Modified step function to include adding moves to move_history list.
         """
         self.move_history.append(cell)
-        super().step(cell)
+        return super().step(cell)
+
+    def undo(self):
+        """
+        Takes back the last move, for games created with undoable=True.
+        """
+        super().undo()
+        self.move_history.pop()
 
     @property
     def current_player(self):
@@ -338,5 +733,9 @@ class Hex(HexBase):
         base = HexBase(self.size)
         base.board = self.board
         base.groups = self.groups
+        base.empty = self.empty
+        base.winner = self.winner
+        base.topology = self.topology
         base.turn = self.turn
+        base.hash = self.hash
         return base
@@ -4,7 +4,7 @@ from string import ascii_letters
 
 import matplotlib.pyplot as plt
 import numpy as np
-from hex.board import EMPTY, P1, P2
+from hex.board import EMPTY, P1, P2, topology
 from hex.gui.theme import GUI_PARAMS
 from matplotlib.patches import Circle, Polygon, RegularPolygon
 
@@ -16,12 +16,25 @@ def get_coords(cell):
     return (iplusj_multiplier*(i+j), jminusi_multiplier*(j-i))
 
 
+@lru_cache(maxsize=5)
+def cell_centres(size):
+    """
+    Returns a float[size*size, 2] array of the plot coordinates of every
+    cell, indexed by flat cell index (i*size + j).
+    """
+    cells = topology(size).cells.astype(float)
+    centres = np.empty_like(cells)
+    centres[:, 0] = 1.5*(cells[:, 0] + cells[:, 1])
+    centres[:, 1] = np.sqrt(3)/2*(cells[:, 1] - cells[:, 0])
+    centres.flags.writeable = False
+    return centres
+
+
 @lru_cache(maxsize=5)
 def coord_matrix(size):
-    coords = np.zeros((size, size), dtype=object)
-    for i, j in np.ndindex(size, size):
-        coords[i, j] = get_coords((i, j))
-    return coords
+    coords = np.empty(size*size, dtype=object)
+    coords[:] = [tuple(centre) for centre in cell_centres(size)]
+    return coords.reshape(size, size)
 
 
 def HexPlot(size):
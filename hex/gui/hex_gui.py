@@ -1,13 +1,17 @@
 import logging as log
+from time import perf_counter
 
 import matplotlib.pyplot as plt
 import numpy as np
 from hex.agent import HexAgent
 from hex.board import EMPTY, Hex, move_to_string, shortest_connection, P1
 from hex.gui.draw_board import (HexPlot, add_move_order, add_piece, add_pieces,
-                                coord_matrix, highlight_tiles)
+                                cell_centres, highlight_tiles)
 from hex.gui.theme import GUI_PARAMS
 
+# Record how long every refresh of the window takes, logged at the end of the game.
+MEASURE_FRAMES = False
+
 
 def player_color(p_no):
     if p_no == P1:
@@ -17,10 +21,19 @@ def player_color(p_no):
 
 class HexGUI():
 
-    def __init__(self, game: Hex):
+    def __init__(self, game: Hex, measure_frames=MEASURE_FRAMES):
         self.game = game
         self.fig, self.ax, _ = HexPlot(game.size)
         add_pieces(self.ax, game.board)
+        # With blitting the titles and new pieces are animated artists, drawn
+        # over a cached image of everything else instead of redrawing all tiles.
+        self.blit = self.fig.canvas.supports_blit
+        self.status = self.fig.suptitle('', animated=self.blit)
+        self.prompt = self.ax.set_title('', animated=self.blit)
+        self.new_pieces = []
+        self.background = None
+        self.frame_times = [] if measure_frames else None
+        self.fig.canvas.mpl_connect('draw_event', self.on_draw)
 
     def show(self):
         '''
@@ -28,13 +41,83 @@ class HexGUI():
         '''
         self.fig.show()
 
+    def on_draw(self, event):
+        '''
+        Caches the window after every full redraw, which leaves out the
+        animated artists, and draws them on top.
+        '''
+        if not self.blit:
+            return
+        self.background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self.fig.draw_artist(self.status)
+        self.fig.draw_artist(self.prompt)
+
     def refresh(self):
         '''
-        Refreshes the GUI window.
+        Refreshes the GUI window. Restores the cached background, draws the
+        pieces placed since the last refresh into it and blits the titles
+        over it, so the cost does not grow with the board size.
+        '''
+        start = perf_counter()
+        canvas = self.fig.canvas
+        if not self.blit:
+            canvas.draw()
+        elif self.background is None:
+            # Caches the background through on_draw.
+            for piece in self.new_pieces:
+                piece.set_animated(False)
+            self.new_pieces.clear()
+            canvas.draw()
+            canvas.blit(self.fig.bbox)
+        else:
+            canvas.restore_region(self.background)
+            if self.new_pieces:
+                for piece in self.new_pieces:
+                    self.fig.draw_artist(piece)
+                    piece.set_animated(False)
+                self.new_pieces.clear()
+                self.background = canvas.copy_from_bbox(self.fig.bbox)
+            self.fig.draw_artist(self.status)
+            self.fig.draw_artist(self.prompt)
+            canvas.blit(self.fig.bbox)
+        canvas.flush_events()
+        if self.frame_times is not None:
+            self.frame_times.append(perf_counter() - start)
+
+    def redraw(self):
+        '''
+        Redraws the whole window with the titles as ordinary artists, for
+        the end screen which changes most of it.
+        '''
+        self.status.set_animated(False)
+        self.prompt.set_animated(False)
+        self.blit = False
+        self.refresh()
+
+    def set_status(self, status, prompt=''):
+        self.status.set_text(status)
+        self.prompt.set_text(prompt)
+
+    def show_move(self, move, turn):
+        '''
+        Adds the piece of a move to the window and refreshes it.
+        '''
+        piece = add_piece(self.ax, move, turn)
+        if self.blit:
+            piece.set_animated(True)
+            self.new_pieces.append(piece)
+        self.refresh()
+
+    def frame_summary(self):
+        '''
+        Mean, median, 95th percentile and maximum seconds of the refreshes
+        measured so far.
         '''
-        self.fig.canvas.draw()
-        self.fig.canvas.flush_events()
-        plt.pause(0.01)
+        if not self.frame_times:
+            return {}
+        times = np.array(self.frame_times)
+        return {'frames': len(times), 'mean': float(times.mean()), 'median': float(np.median(times)),
+                'p95': float(np.percentile(times, 95)), 'max': float(times.max())}
 
     def pt_on_board(self, x: int, y: int) -> tuple:
         '''
@@ -43,17 +126,18 @@ class HexGUI():
         if (x == None) or (y == None):
             return (False, None)
 
-        coords = coord_matrix(self.game.size)
-        for i, j in np.ndindex(coords.shape):
-            x_coord, y_coord = coords[i, j]
-            inradius = GUI_PARAMS['P1_piece']['radius']
-            if ((x-x_coord)**2 + (y-y_coord)**2 - inradius**2) < 0:
-                return (True, (i, j))
+        centres = cell_centres(self.game.size)
+        distances = (centres[:, 0] - x)**2 + (centres[:, 1] - y)**2
+        index = int(distances.argmin())
+        inradius = GUI_PARAMS['P1_piece']['radius']
+        if distances[index] - inradius**2 < 0:
+            return (True, divmod(index, self.game.size))
         return (False, None)
 
     def get_human_move(self) -> tuple:
         '''
-        Gets human move from the GUI.
+        Gets human move from the GUI. If the opponent is an agent it
+        ponders on the position meanwhile.
         '''
         human_move = {'Found_valid_move': False, 'move': None}
 
@@ -71,9 +155,18 @@ class HexGUI():
                     curr_player = self.game.current_player
                     log.info(f'Move on {move_to_string(move)} registered for {curr_player}.')
 
+        opponent = self.game.players[-self.game.turn]
+        agent = HexAgent.get_agent(opponent.name) if opponent.is_AI else None
+        if agent is not None:
+            agent.start_pondering(self.game)
+
         event_handler_id = self.fig.canvas.mpl_connect('button_press_event', getmove_onclick)
         while human_move['Found_valid_move'] == False:
-            plt.pause(0.1)
+            # Unlike plt.pause this does not redraw the stale figure.
+            self.fig.canvas.start_event_loop(0.1)
+
+        if agent is not None:
+            agent.stop_pondering()
         return human_move['move']
 
     def get_agent_move(self) -> tuple:
@@ -90,21 +183,20 @@ class HexGUI():
         while self.game.winner is None:
             turn = self.game.turn
             player = self.game.players[turn]
-            self.fig.suptitle(f'{player.name} ({player_color(turn)}) to move.')
+            status = f'{player.name} ({player_color(turn)}) to move.'
 
             if player.is_AI:
-                self.ax.set_title('Computer is thinking ...')
+                self.set_status(status, 'Computer is thinking ...')
                 self.refresh()
                 move = self.get_agent_move()
 
             else:
-                self.ax.set_title('Click on empty square to register a move')
+                self.set_status(status, 'Click on empty square to register a move')
                 self.refresh()
                 move = self.get_human_move()
 
             self.game.step(move)
-            add_piece(self.ax, move, turn)
-            self.refresh()
+            self.show_move(move, turn)
 
     def render_game_end(self, label_moves=True, connection=True) -> None:
         '''
@@ -113,23 +205,25 @@ class HexGUI():
         winner = self.game.winner
         winner_name = self.game.players[winner].name
 
-        self.fig.suptitle(f'{winner_name}({player_color(winner)}) won the game')
-        self.ax.set_title('')
-        self.refresh()
+        self.set_status(f'{winner_name}({player_color(winner)}) won the game')
+        if self.frame_times is not None:
+            log.info(f'Frame times (s): {self.frame_summary()}')
 
         if label_moves == True:
             add_move_order(self.ax, self.game.board, self.game.move_history)
-        self.refresh()
 
         if connection == True:
             highlight_tiles(self.ax, shortest_connection(self.game.board, self.game.size, self.game.winner))
-        self.refresh()
+        self.redraw()
 
     @classmethod
     def start_game(cls, game: Hex):
         '''
         Starts the game.
         '''
+        for player in game.players.values():
+            if player.is_AI:
+                HexAgent.setup(player.name)
         gui = cls(game)
         gui.show()
         gui.simulate_game()
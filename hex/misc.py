@@ -1,11 +1,9 @@
-from random import choice
-
-from hex.board import Hex, possible_moves
+from hex.board import Hex
 
 
 def random_game():
     board = Hex(6)
     while board.winner is None:
-        move = choice(possible_moves(board.size, board.board))
+        move = board.random_move()
         board.step(move)
     return board
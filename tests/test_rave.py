@@ -0,0 +1,69 @@
+import random
+
+import numpy as np
+import pytest
+from agents.mcts import MCTSAgent
+from agents.rollout import RolloutResult
+from hex.board import P1, P2, HexBase
+
+from benchmarks.reference import reference_rave_deltas
+
+WARMUP_ROLLOUTS = 300
+ROLLOUTS = 100
+
+
+def seeded_agent(size):
+    random.seed(size)
+    agent = MCTSAgent(HexBase(size))
+    agent.rng = np.random.default_rng(size)
+    agent.search(WARMUP_ROLLOUTS)
+    return agent
+
+
+def rave_deltas(tree, backpropagate):
+    '''
+    Runs backpropagate and returns {node: (N_rave delta, Q_rave delta)} of
+    the nodes whose RAVE statistics it changed.
+    '''
+    N_rave = tree.N_rave[:tree.num_nodes].copy()
+    Q_rave = tree.Q_rave[:tree.num_nodes].copy()
+    backpropagate()
+    dN = tree.N_rave[:tree.num_nodes] - N_rave
+    dQ = tree.Q_rave[:tree.num_nodes] - Q_rave
+    return {int(node): (int(dN[node]), int(dQ[node])) for node in np.flatnonzero((dN != 0) | (dQ != 0))}
+
+
+def single_rollout_result(owner, outcome, size):
+    '''
+    The RolloutResult of a batch holding only the playout that gave owner.
+    '''
+    amaf_visits = {player: (owner == player).astype(np.int64).reshape(size, size) for player in (P1, P2)}
+    amaf_wins = {player: amaf_visits[player] * (outcome == player) for player in (P1, P2)}
+    return RolloutResult({P1: int(outcome == P1), P2: int(outcome == P2)}, amaf_visits, amaf_wins)
+
+
+@pytest.mark.parametrize('size', [3, 6, 8])
+def test_backpropagate_matches_reference(size):
+    agent = seeded_agent(size)
+    tree = agent.tree
+    root_turn = agent.root_state.turn
+    for _ in range(ROLLOUTS):
+        node, state = agent.select_node()
+        turn = state.turn
+        outcome, owner = agent.simulate(state)
+        expected = reference_rave_deltas(tree, node, outcome, turn, owner.copy(), root_turn)
+        assert rave_deltas(tree, lambda: agent.backpropagate(node, outcome, turn, owner)) == expected
+
+
+@pytest.mark.parametrize('size', [3, 6, 8])
+def test_backpropagate_batch_matches_reference(size):
+    agent = seeded_agent(size)
+    tree = agent.tree
+    root_turn = agent.root_state.turn
+    for _ in range(ROLLOUTS):
+        node, state = agent.select_node()
+        turn = state.turn
+        outcome, owner = agent.simulate(state)
+        expected = reference_rave_deltas(tree, node, outcome, turn, owner.copy(), root_turn)
+        result = single_rollout_result(owner, outcome, size)
+        assert rave_deltas(tree, lambda: agent.backpropagate_batch(node, turn, result)) == expected